@@ -0,0 +1,101 @@
+"""Memoized access resolution: tenant roles, project tenants and project roles.
+
+Lookups are memoized for the current request (see RequestScopeMiddleware) and across requests
+in a short-TTL cache. Membership writes must call the invalidate_* helpers.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Callable, Hashable
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import get_settings
+
+_request_memo: ContextVar[dict | None] = ContextVar("access_request_memo", default=None)
+_cache = TTLCache(get_settings().ACCESS_CACHE_TTL_SEC)
+
+
+class RequestScopeMiddleware:
+    """ASGI middleware giving each HTTP request a fresh access memo."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_memo.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_memo.reset(token)
+
+
+def cached_lookup(key: Hashable, loader: Callable[[], Any]) -> Any:
+    """Return the memoized value for key, calling loader on a miss. None results are not cached."""
+    memo = _request_memo.get()
+    if memo is not None and key in memo:
+        return memo[key]
+    value = _cache.get(key)
+    if value is MISSING:
+        value = loader()
+        if value is None:
+            return None
+        _cache.set(key, value)
+    if memo is not None:
+        memo[key] = value
+    return value
+
+
+def peek(key: Hashable) -> Any:
+    """Return the memoized value for key or MISSING, without loading."""
+    memo = _request_memo.get()
+    if memo is not None and key in memo:
+        return memo[key]
+    value = _cache.get(key)
+    if value is not MISSING and memo is not None:
+        memo[key] = value
+    return value
+
+
+def remember(key: Hashable, value: Any) -> None:
+    _cache.set(key, value)
+    memo = _request_memo.get()
+    if memo is not None:
+        memo[key] = value
+
+
+def _forget(predicate: Callable[[Hashable], bool]) -> None:
+    _cache.delete_where(predicate)
+    memo = _request_memo.get()
+    if memo:
+        for key in [k for k in memo if predicate(k)]:
+            del memo[key]
+
+
+def tenant_role_key(tenant_id: str, user_id: str) -> tuple:
+    return ("tenant_role", str(tenant_id), str(user_id))
+
+
+def project_tenant_key(project_id: str) -> tuple:
+    return ("project_tenant", str(project_id))
+
+
+def project_role_key(project_id: str, user_id: str) -> tuple:
+    return ("project_role", str(project_id), str(user_id))
+
+
+def invalidate_tenant_member(tenant_id: str, user_id: str) -> None:
+    key = tenant_role_key(tenant_id, user_id)
+    _forget(lambda k: k == key)
+
+
+def invalidate_project_member(project_id: str, user_id: str) -> None:
+    key = project_role_key(project_id, user_id)
+    _forget(lambda k: k == key)
+
+
+def invalidate_project(project_id: str) -> None:
+    """Drop everything cached for a project (e.g. after delete)."""
+    pid = str(project_id)
+    _forget(lambda k: k[0] in ("project_tenant", "project_role") and k[1] == pid)
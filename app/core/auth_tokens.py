@@ -0,0 +1,134 @@
+"""Local verification of Supabase access tokens against a cached JWKS."""
+
+import logging
+import threading
+import time
+
+import httpx
+import jwt
+
+from app.core.config import Settings
+
+log = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+# Unknown kid triggers a synchronous refresh at most this often (protects against token spraying)
+MIN_FORCED_REFRESH_SEC = 30.0
+
+
+class JWKSCache:
+    """Signing keys of the Supabase Auth server keyed by kid, refreshed periodically in the background."""
+
+    def __init__(self, jwks_url: str, refresh_sec: float):
+        self.jwks_url = jwks_url
+        self.refresh_sec = refresh_sec
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        # Serialises fetches, so concurrent misses on an unknown kid share one request
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def refresh(self) -> None:
+        with self._refresh_lock:
+            self._fetch()
+
+    def _fetch(self) -> None:
+        # Failed attempts count too, so an unreachable endpoint is not retried on every request
+        with self._lock:
+            self._fetched_at = time.monotonic()
+        try:
+            with httpx.Client(timeout=10.0) as client:
+                r = client.get(self.jwks_url)
+                r.raise_for_status()
+                jwk_set = jwt.PyJWKSet.from_dict(r.json())
+        except Exception as e:
+            log.warning("Could not refresh JWKS from %s: %s", self.jwks_url, e)
+            return
+        keys = {k.key_id: k for k in jwk_set.keys if k.key_id}
+        with self._lock:
+            self._keys = keys
+
+    def get_key(self, kid: str | None) -> jwt.PyJWK | None:
+        """Return the key for kid; on a miss refresh once (rate limited) before giving up."""
+        if not kid:
+            return None
+        with self._lock:
+            key = self._keys.get(kid)
+        if key is not None:
+            return key
+        with self._refresh_lock:
+            # Re-check under the refresh lock: a concurrent miss may just have fetched
+            with self._lock:
+                key = self._keys.get(kid)
+                stale = time.monotonic() - self._fetched_at > MIN_FORCED_REFRESH_SEC
+            if key is None and stale:
+                self._fetch()
+                with self._lock:
+                    key = self._keys.get(kid)
+        return key
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_sec)
+
+
+_jwks: JWKSCache | None = None
+_jwks_lock = threading.Lock()
+
+
+def get_jwks_cache(settings: Settings) -> JWKSCache:
+    global _jwks
+    with _jwks_lock:
+        if _jwks is None:
+            url = f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+            _jwks = JWKSCache(url, settings.SUPABASE_JWKS_REFRESH_SEC)
+        return _jwks
+
+
+def verify_access_token(token: str, settings: Settings, jwks: JWKSCache | None = None) -> dict | None:
+    """Verify signature, expiry, audience and issuer locally and return the current_user dict.
+
+    Returns None when the token cannot be checked locally (unknown kid, HS256 without a configured
+    secret) so the caller can fall back to auth.get_user. Raises jwt.InvalidTokenError if invalid.
+    """
+    header = jwt.get_unverified_header(token)
+    alg = header.get("alg")
+    if alg == "HS256":
+        if not settings.SUPABASE_JWT_SECRET:
+            return None
+        key = settings.SUPABASE_JWT_SECRET
+    elif alg in ASYMMETRIC_ALGORITHMS:
+        signing_key = (jwks or get_jwks_cache(settings)).get_key(header.get("kid"))
+        if signing_key is None:
+            return None
+        key = signing_key.key
+    else:
+        raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {alg}")
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience=settings.SUPABASE_JWT_AUDIENCE,
+        issuer=f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1",
+        options={"require": ["exp", "sub"]},
+    )
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "raw_user_metadata": claims.get("user_metadata") or {},
+        "app_metadata": claims.get("app_metadata") or {},
+    }
@@ -13,6 +13,37 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     CORE_SERVICE_URL: str = ""
     CORE_SERVICE_API_KEY: str = ""
+    # Shared Supabase HTTP pool (one per process, see app.core.supabase_client)
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 50
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 20
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY_SEC: float = 30.0
+    SUPABASE_HTTP_TIMEOUT_SEC: float = 30.0
+    SUPABASE_HTTP2: bool = True
+    # Verify access tokens locally (JWKS / JWT secret) instead of calling auth.get_user per request
+    AUTH_LOCAL_JWT_VERIFY: bool = False
+    SUPABASE_JWT_SECRET: str = ""
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    SUPABASE_JWKS_REFRESH_SEC: float = 600.0
+    # How long resolved tenant/project roles are reused across requests
+    ACCESS_CACHE_TTL_SEC: float = 30.0
+    # Concurrent per-project fan-out (app.core.fanout)
+    FANOUT_POOL_SIZE: int = 32
+    FANOUT_MAX_CONCURRENCY: int = 8
+    FANOUT_TIMEOUT_SEC: float = 20.0
+    PROJECT_QUERY_BATCH_SIZE: int = 20
+    # Dashboard summary cache: fresh for TTL, then served stale (while refreshing) up to STALE more seconds
+    DASHBOARD_CACHE_TTL_SEC: float = 60.0
+    DASHBOARD_CACHE_STALE_SEC: float = 300.0
+    # Per-tenant master-materials catalog; writes in this process invalidate immediately, the TTL bounds staleness across workers
+    CATALOG_CACHE_TTL_SEC: float = 300.0
+    # Background threads rendering thumbnail/web variants of uploaded images (app.core.media)
+    MEDIA_WORKERS: int = 2
+    # Variant jobs queued or running before new ones are deferred to the sweep (each holds an upload in memory)
+    MEDIA_QUEUE_SIZE: int = 32
+    # Recorded variant jobs idle this long are re-queued by the sweep, which runs every INTERVAL seconds
+    MEDIA_SWEEP_AGE_SEC: float = 600.0
+    MEDIA_SWEEP_INTERVAL_SEC: float = 120.0
+    MEDIA_MAX_ATTEMPTS: int = 5
 
 
 def get_settings() -> Settings:
@@ -2,6 +2,9 @@
 
 DB_SCHEMA = "fieldops"
 
+# Task status names (case-insensitive) that count as finished for due-task counts
+DONE_TASK_STATUS_NAMES = ("Done", "Completed", "Closed")
+
 MATERIAL_UNITS = (
     "kg",
     "L",
@@ -1,17 +1,22 @@
 from fastapi import Depends, Header, HTTPException, Query
-from supabase import Client, create_client
+from supabase import Client
+import jwt
 import logging
 
 
+from app.core.access import cached_lookup, peek, project_role_key, project_tenant_key, remember, tenant_role_key
+from app.core.cache import MISSING
+from app.core.auth_tokens import verify_access_token
 from app.core.config import Settings, get_settings
 from app.core.constants import DB_SCHEMA
 from app.core.permissions import has_permission
+from app.core.supabase_client import init_supabase_client
 
 
 def get_supabase_client(settings: Settings = Depends(get_settings)) -> Client:
     if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_ROLE_KEY:
         raise HTTPException(status_code=503, detail="Supabase not configured (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY)")
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return init_supabase_client(settings)
 
 
 def get_bearer_token(authorization: str | None = Header(None, alias="Authorization")) -> str:
@@ -26,7 +31,15 @@ def get_bearer_token(authorization: str | None = Header(None, alias="Authorizati
 def get_current_user(
     token: str = Depends(get_bearer_token),
     supabase: Client = Depends(get_supabase_client),
+    settings: Settings = Depends(get_settings),
 ) -> dict:
+    if settings.AUTH_LOCAL_JWT_VERIFY:
+        try:
+            user = verify_access_token(token, settings)
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if user is not None:
+            return user
     try:
         response = supabase.auth.get_user(token)
         if not response or not response.user:
@@ -69,11 +82,7 @@ def _ensure_first_tenant_admin(
             pass  # race: another request inserted; re-query will return role
 
 
-def get_tenant_membership(
-    tenant_id: str,
-    user_id: str,
-    supabase: Client = Depends(get_supabase_client),
-) -> str | None:
+def _query_tenant_role(supabase: Client, tenant_id: str, user_id: str) -> str | None:
     r = (
         supabase.schema(DB_SCHEMA).table("tenant_members")
         .select("role")
@@ -85,19 +94,26 @@ def get_tenant_membership(
     if r and r.data:
         row = r.data[0] if isinstance(r.data, list) and r.data else r.data
         return row.get("role") if isinstance(row, dict) else None
+    return None
+
+
+def _load_tenant_membership(supabase: Client, tenant_id: str, user_id: str) -> str | None:
+    role = _query_tenant_role(supabase, tenant_id, user_id)
+    if role is not None:
+        return role
     _ensure_first_tenant_admin(tenant_id, user_id, supabase)
-    r2 = (
-        supabase.schema(DB_SCHEMA).table("tenant_members")
-        .select("role")
-        .eq("tenant_id", tenant_id)
-        .eq("user_id", user_id)
-        .maybe_single()
-        .execute()
+    return _query_tenant_role(supabase, tenant_id, user_id)
+
+
+def get_tenant_membership(
+    tenant_id: str,
+    user_id: str,
+    supabase: Client = Depends(get_supabase_client),
+) -> str | None:
+    return cached_lookup(
+        tenant_role_key(tenant_id, user_id),
+        lambda: _load_tenant_membership(supabase, tenant_id, user_id),
     )
-    if r2 and r2.data:
-        row = r2.data[0] if isinstance(r2.data, list) and r2.data else r2.data
-        return row.get("role") if isinstance(row, dict) else None
-    return None
 
 
 def require_tenant_org_admin(
@@ -122,42 +138,93 @@ def _first_row(result) -> dict | None:
     return data if isinstance(data, dict) else None
 
 
+def _resolve_access(supabase: Client, project_id: str, user_id: str) -> tuple[str | None, str | None, str]:
+    """Return (project tenant_id, tenant role, project role or "") from cache, else one RPC round trip."""
+    project_tenant_id = peek(project_tenant_key(project_id))
+    project_role = peek(project_role_key(project_id, user_id))
+    tenant_role = MISSING
+    if project_tenant_id is not MISSING:
+        tenant_role = peek(tenant_role_key(project_tenant_id, user_id))
+    if project_tenant_id is not MISSING and tenant_role is not MISSING and (
+        tenant_role == "org_admin" or project_role is not MISSING
+    ):
+        return project_tenant_id, tenant_role, project_role if project_role is not MISSING else ""
+    r = supabase.schema(DB_SCHEMA).rpc(
+        "resolve_project_access", {"p_project_id": project_id, "p_user_id": user_id}
+    ).execute()
+    row = _first_row(r)
+    if not row or not row.get("project_tenant_id"):
+        return None, None, ""
+    project_tenant_id = str(row["project_tenant_id"])
+    tenant_role = row.get("tenant_role")
+    project_role = row.get("project_role") or ""
+    remember(project_tenant_key(project_id), project_tenant_id)
+    remember(project_role_key(project_id, user_id), project_role)
+    if tenant_role:
+        remember(tenant_role_key(project_tenant_id, user_id), tenant_role)
+    return project_tenant_id, tenant_role, project_role
+
+
 def ensure_project_access(
     supabase: Client, tenant_id: str, user_id: str, project_id: str, required_permission: str
 ) -> dict:
     """Validate user has access to project and required permission. Returns access dict or raises HTTPException."""
-    proj_result = (
-        supabase.schema(DB_SCHEMA).table("projects")
-        .select("id, tenant_id")
-        .eq("id", project_id)
-        .maybe_single()
-        .execute()
-    )
-    proj = _first_row(proj_result)
-    if not proj:
+    project_tenant_id, tenant_role, role = _resolve_access(supabase, project_id, user_id)
+    if not project_tenant_id:
         raise HTTPException(status_code=404, detail="Project not found")
-    if str(proj.get("tenant_id")) != str(tenant_id):
+    if project_tenant_id != str(tenant_id):
         raise HTTPException(status_code=403, detail="Project not in your tenant")
-    tenant_role = get_tenant_membership(tenant_id, user_id, supabase)
+    if not tenant_role:
+        # Not a tenant member yet: may bootstrap the first org_admin
+        tenant_role = get_tenant_membership(tenant_id, user_id, supabase)
     if tenant_role == "org_admin":
         return {"project_id": project_id, "tenant_id": tenant_id, "role": "admin"}
-    mem_result = (
-        supabase.schema(DB_SCHEMA).table("project_members")
-        .select("role")
-        .eq("project_id", project_id)
-        .eq("user_id", user_id)
-        .maybe_single()
-        .execute()
-    )
-    mem = _first_row(mem_result)
-    if not mem:
+    if not role:
         raise HTTPException(status_code=403, detail="Not a project member")
-    role = mem.get("role") or "viewer"
     if not has_permission(role, required_permission):
         raise HTTPException(status_code=403, detail="Insufficient permission")
     return {"project_id": project_id, "tenant_id": tenant_id, "role": role}
 
 
+def list_projects_with_access(
+    supabase: Client,
+    tenant_id: str,
+    user_id: str,
+    required_permission: str,
+    project_ids: list[str] | None = None,
+) -> list[tuple[str, str]]:
+    """(project_id, project_name) the user holds required_permission on, in one query.
+
+    project_ids=None means every such project in the tenant; otherwise results keep the requested order.
+    """
+    tenant_role = get_tenant_membership(tenant_id, user_id, supabase)
+    if tenant_role == "org_admin":
+        query = supabase.schema(DB_SCHEMA).table("projects").select("id, name").eq("tenant_id", tenant_id)
+        if project_ids is not None:
+            query = query.in_("id", project_ids)
+        r = query.order("created_at", desc=True).execute()
+        rows = [(str(row["id"]), row["name"]) for row in (r.data or [])]
+    else:
+        query = (
+            supabase.schema(DB_SCHEMA).table("project_members")
+            .select("project_id, role, projects!inner(name, tenant_id)")
+            .eq("user_id", user_id)
+            .eq("projects.tenant_id", tenant_id)
+        )
+        if project_ids is not None:
+            query = query.in_("project_id", project_ids)
+        r = query.execute()
+        rows = [
+            (str(row["project_id"]), (row.get("projects") or {}).get("name") or "")
+            for row in (r.data or [])
+            if has_permission(row.get("role") or "viewer", required_permission)
+        ]
+    if project_ids is not None:
+        order = {pid: i for i, pid in enumerate(project_ids)}
+        rows.sort(key=lambda p: order.get(p[0], len(order)))
+    return rows
+
+
 def get_project_access(required_permission: str):
     """Dependency factory: ensure user has access to project and required permission. Org admins have access to all projects in their tenant."""
 
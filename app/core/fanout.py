@@ -0,0 +1,78 @@
+"""Bounded concurrent fan-out for independent per-project queries."""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, TypeVar
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=get_settings().FANOUT_POOL_SIZE, thread_name_prefix="fanout")
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def fan_out(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    max_concurrency: int | None = None,
+    timeout_sec: float | None = None,
+) -> list[R]:
+    """Run fn over items on the shared pool, at most max_concurrency at a time; results keep input order.
+
+    Raises TimeoutError if everything has not finished within timeout_sec (pending calls are cancelled),
+    and re-raises the first exception raised by fn.
+    """
+    settings = get_settings()
+    items = list(items)
+    if not items:
+        return []
+    limit = max(1, max_concurrency or settings.FANOUT_MAX_CONCURRENCY)
+    if len(items) == 1:
+        return [fn(items[0])]
+    deadline = time.monotonic() + (timeout_sec if timeout_sec is not None else settings.FANOUT_TIMEOUT_SEC)
+    executor = _get_executor()
+    results: list = [None] * len(items)
+    pending: dict[Future, int] = {}
+    next_index = 0
+    try:
+        while next_index < len(items) or pending:
+            while next_index < len(items) and len(pending) < limit:
+                ctx = contextvars.copy_context()
+                pending[executor.submit(ctx.run, fn, items[next_index])] = next_index
+                next_index += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"fan_out did not finish within the time limit ({len(pending)} calls pending)")
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                results[pending.pop(fut)] = fut.result()
+    finally:
+        for fut in pending:
+            fut.cancel()
+    return results
+
+
+def chunked(items: list[T], size: int) -> list[list[T]]:
+    size = max(1, size)
+    return [items[i : i + size] for i in range(0, len(items), size)]
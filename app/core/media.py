@@ -0,0 +1,233 @@
+"""Thumbnail and web-size JPEG variants of uploaded images, generated off the request path.
+
+Every scheduled image is recorded in media_variant_jobs until its variants are stored, so jobs skipped
+on a full queue or lost with a stopped instance are picked up again by the periodic sweep.
+"""
+
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from supabase import Client
+
+from app.core.config import get_settings
+from app.core.constants import DB_SCHEMA
+
+log = logging.getLogger(__name__)
+
+# variant -> (longest side in px, JPEG quality)
+VARIANTS: dict[str, tuple[int, int]] = {
+    "thumb": (320, 70),
+    "web": (1600, 80),
+}
+
+# Formats Pillow decodes without plugins; other uploads (e.g. HEIC receipts) are kept as originals only
+IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "webp"})
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+# Jobs queued or running; each may hold a whole upload in memory, so the backlog is capped
+_slots = threading.BoundedSemaphore(get_settings().MEDIA_QUEUE_SIZE)
+_sweep_stop = threading.Event()
+_sweep_thread: threading.Thread | None = None
+
+
+def variant_path(path: str, variant: str) -> str:
+    """Deterministic object path of a variant: a/b/photo.jpg -> a/b/photo__thumb.jpg."""
+    head, dot, ext = path.rpartition(".")
+    stem = head if dot and "/" not in ext else path
+    return f"{stem}__{variant}.jpg"
+
+
+def find_variant(supabase: Client, bucket: str, paths: list[str], variant: str) -> str | None:
+    """Stored path of a rendered variant of the first of paths that has one (per media_variants), else None."""
+    r = (
+        supabase.schema(DB_SCHEMA)
+        .table("media_variants")
+        .select("object_path, variant_path")
+        .eq("bucket", bucket)
+        .eq("variant", variant)
+        .in_("object_path", paths)
+        .execute()
+    )
+    found = {row["object_path"]: row["variant_path"] for row in (r.data or [])}
+    return next((found[p] for p in paths if p in found), None)
+
+
+def render_variants(content: bytes) -> dict[str, tuple[bytes, int, int]]:
+    """variant -> (jpeg bytes, width, height); raises ValueError if content is not a readable image.
+
+    JPEGs are decoded at reduced scale (draft) and each variant is downscaled from the previous,
+    larger one, so a 12 MP photo never sits in memory at full size more than once.
+    """
+    largest = max(side for side, _ in VARIANTS.values())
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            img.draft("RGB", (largest, largest))
+            img = ImageOps.exif_transpose(img).convert("RGB")
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"Not an image: {e}")
+    out: dict[str, tuple[bytes, int, int]] = {}
+    for variant, (max_side, quality) in sorted(VARIANTS.items(), key=lambda kv: -kv[1][0]):
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+        out[variant] = (buf.getvalue(), img.width, img.height)
+    return out
+
+
+def _generate(supabase: Client, bucket: str, path: str, content: bytes) -> None:
+    try:
+        rendered = render_variants(content)
+    except ValueError as e:
+        log.info("Skipping variants for %s/%s: %s", bucket, path, e)
+        return
+    rows = []
+    for variant, (data, width, height) in rendered.items():
+        target = variant_path(path, variant)
+        supabase.storage.from_(bucket).upload(
+            target, data, file_options={"content-type": "image/jpeg", "upsert": "true"}
+        )
+        rows.append(
+            {
+                "bucket": bucket,
+                "object_path": path,
+                "variant": variant,
+                "variant_path": target,
+                "width": width,
+                "height": height,
+                "size_bytes": len(data),
+            }
+        )
+    supabase.schema(DB_SCHEMA).table("media_variants").upsert(rows, on_conflict="bucket,object_path,variant").execute()
+
+
+def _mark_pending(supabase: Client, bucket: str, path: str) -> None:
+    try:
+        supabase.schema(DB_SCHEMA).table("media_variant_jobs").upsert(
+            {"bucket": bucket, "object_path": path}, on_conflict="bucket,object_path", ignore_duplicates=True
+        ).execute()
+    except Exception as e:
+        log.warning("Could not record variant job for %s/%s: %s", bucket, path, e)
+
+
+def _clear_pending(supabase: Client, bucket: str, path: str) -> None:
+    supabase.schema(DB_SCHEMA).table("media_variant_jobs").delete().eq("bucket", bucket).eq("object_path", path).execute()
+
+
+def _run(supabase: Client, bucket: str, path: str, content: bytes | None) -> None:
+    try:
+        if content is None:
+            content = supabase.storage.from_(bucket).download(path)
+        _generate(supabase, bucket, path, content)
+        _clear_pending(supabase, bucket, path)
+    except Exception:
+        log.exception("Variant generation failed for %s/%s", bucket, path)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=get_settings().MEDIA_WORKERS, thread_name_prefix="media")
+        return _executor
+
+
+def _submit(supabase: Client, bucket: str, path: str, content: bytes | None) -> bool:
+    """Queue one job unless MEDIA_QUEUE_SIZE jobs are already pending; skipped jobs are left to the sweep."""
+    if not _slots.acquire(blocking=False):
+        log.warning("Media queue full, deferring variants for %s/%s to the sweep", bucket, path)
+        return False
+    try:
+        future = _get_executor().submit(_run, supabase, bucket, path, content)
+    except RuntimeError:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return True
+
+
+def schedule_variants(supabase: Client, bucket: str, path: str, content: bytes, content_type: str) -> None:
+    """Queue variant generation for an uploaded image; non-images (e.g. PDF receipts) are ignored."""
+    if not content_type.startswith("image/") or content_type in ("image/heic", "image/heif"):
+        return
+    _mark_pending(supabase, bucket, path)
+    _submit(supabase, bucket, path, content)
+
+
+def schedule_stored_variants(supabase: Client, bucket: str, path: str) -> None:
+    """Queue variants for an object the client uploaded directly; the worker downloads it first."""
+    if path.rpartition(".")[2].lower() not in IMAGE_EXTENSIONS:
+        return
+    _mark_pending(supabase, bucket, path)
+    _submit(supabase, bucket, path, None)
+
+
+def sweep_pending_variants(supabase: Client) -> int:
+    """Re-queue recorded jobs idle for MEDIA_SWEEP_AGE_SEC (skipped or lost); returns how many were queued.
+
+    Each pass bumps attempts and queued_at, so a job is not picked again while it may still be in
+    another instance's queue, and objects that keep failing stop after MEDIA_MAX_ATTEMPTS.
+    """
+    settings = get_settings()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.MEDIA_SWEEP_AGE_SEC)
+    r = (
+        supabase.schema(DB_SCHEMA)
+        .table("media_variant_jobs")
+        .select("bucket, object_path, attempts")
+        .lt("queued_at", cutoff.isoformat())
+        .lt("attempts", settings.MEDIA_MAX_ATTEMPTS)
+        .order("queued_at")
+        .limit(settings.MEDIA_QUEUE_SIZE)
+        .execute()
+    )
+    queued = 0
+    for row in r.data or []:
+        if not _submit(supabase, row["bucket"], row["object_path"], None):
+            break
+        (
+            supabase.schema(DB_SCHEMA)
+            .table("media_variant_jobs")
+            .update({"attempts": row["attempts"] + 1, "queued_at": datetime.now(timezone.utc).isoformat()})
+            .eq("bucket", row["bucket"])
+            .eq("object_path", row["object_path"])
+            .execute()
+        )
+        queued += 1
+    return queued
+
+
+def _sweep_loop(supabase: Client, interval_sec: float) -> None:
+    while not _sweep_stop.wait(interval_sec):
+        try:
+            n = sweep_pending_variants(supabase)
+            if n:
+                log.info("Re-queued %d pending variant jobs", n)
+        except Exception:
+            log.exception("Variant sweep failed")
+
+
+def start_media_sweeper(supabase: Client) -> None:
+    """Run sweep_pending_variants every MEDIA_SWEEP_INTERVAL_SEC in a daemon thread (app startup)."""
+    global _sweep_thread
+    if _sweep_thread is not None:
+        return
+    _sweep_stop.clear()
+    _sweep_thread = threading.Thread(
+        target=_sweep_loop, args=(supabase, get_settings().MEDIA_SWEEP_INTERVAL_SEC), name="media-sweep", daemon=True
+    )
+    _sweep_thread.start()
+
+
+def shutdown_media_workers() -> None:
+    """Stop the sweep and finish queued variants (app shutdown); unfinished jobs stay recorded for the sweep."""
+    global _executor, _sweep_thread
+    _sweep_stop.set()
+    _sweep_thread = None
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
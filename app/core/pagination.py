@@ -0,0 +1,47 @@
+"""Opaque keyset cursors over (created_at, id) ordered newest first."""
+
+import base64
+import uuid
+from datetime import datetime
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: str, row_id: str) -> str:
+    raw = f"{created_at}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """Return (created_at, id) from a cursor; raises ValueError if malformed.
+
+    Both parts are validated (ISO timestamp, UUID) because they are spliced into a PostgREST filter.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except Exception:
+        raise ValueError("Invalid cursor")
+    created_at, sep, row_id = raw.partition("|")
+    if not sep:
+        raise ValueError("Invalid cursor")
+    try:
+        datetime.fromisoformat(created_at)
+        row_id = str(uuid.UUID(row_id))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def keyset_before(cursor: str, ts_col: str = "created_at", id_col: str = "id") -> str:
+    """PostgREST or-filter selecting rows strictly after the cursor in (ts desc, id desc) order."""
+    created_at, row_id = decode_cursor(cursor)
+    return f'{ts_col}.lt."{created_at}",and({ts_col}.eq."{created_at}",{id_col}.lt.{row_id})'
+
+
+def split_page(rows: list[dict], limit: int, ts_col: str = "created_at", id_col: str = "id") -> tuple[list[dict], str | None]:
+    """Given up to limit + 1 rows, return the page and the cursor for the next one (None on the last page)."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(str(last[ts_col]), str(last[id_col]))
@@ -0,0 +1,94 @@
+"""Storage buckets used by uploads: checked once at startup, then trusted from an in-process set."""
+
+import logging
+import threading
+from datetime import date
+
+from supabase import Client
+
+from app.core.media import schedule_stored_variants, schedule_variants
+
+log = logging.getLogger(__name__)
+
+STORAGE_BUCKETS = ("daily_reports", "attendance", "expense", "material_receipts")
+
+_known: set[str] = set()
+_lock = threading.Lock()
+
+
+def _bucket_name(bucket) -> str | None:
+    if isinstance(bucket, dict):
+        return bucket.get("name")
+    return getattr(bucket, "name", None)
+
+
+def bootstrap_buckets(supabase: Client, buckets: tuple[str, ...] = STORAGE_BUCKETS) -> None:
+    """Create any missing private buckets with one list call; failures are logged and retried on next upload."""
+    with _lock:
+        missing = [b for b in buckets if b not in _known]
+        if not missing:
+            return
+        try:
+            existing = {_bucket_name(b) for b in (supabase.storage.list_buckets() or [])}
+        except Exception as e:
+            log.warning("Could not list storage buckets: %s", e)
+            return
+        for bucket in missing:
+            if bucket not in existing:
+                try:
+                    supabase.storage.create_bucket(bucket, options={"public": False})
+                    log.info("Created storage bucket: %s", bucket)
+                except Exception as e:
+                    log.warning("Could not create bucket %s: %s", bucket, e)
+                    continue
+            _known.add(bucket)
+
+
+def ensure_bucket(supabase: Client, bucket: str) -> None:
+    """No storage call once the bucket is known (normally since startup)."""
+    if bucket not in _known:
+        bootstrap_buckets(supabase, (bucket,))
+
+
+def upload_object(supabase: Client, bucket: str, path: str, content: bytes, content_type: str) -> str:
+    """Upload and queue thumbnail/web variants for images (see app.core.media)."""
+    ensure_bucket(supabase, bucket)
+    supabase.storage.from_(bucket).upload(path, content, file_options={"content-type": content_type})
+    schedule_variants(supabase, bucket, path, content, content_type)
+    return path
+
+
+def create_upload_url(supabase: Client, bucket: str, path: str) -> dict:
+    """Signed URL (and token) the client uses to upload the object itself, bypassing the API."""
+    ensure_bucket(supabase, bucket)
+    res = supabase.storage.from_(bucket).create_signed_upload_url(path)
+    return {"bucket": bucket, "path": path, "signed_url": res["signed_url"], "token": res["token"]}
+
+
+def key_date(value: str, name: str = "date") -> str:
+    """A YYYY-MM-DD value about to become part of an object key, in canonical form. Raises ValueError."""
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def confirm_upload(supabase: Client, bucket: str, path: str, prefix: str) -> str:
+    """Check a client-uploaded object before it is recorded and queue its variants.
+
+    prefix is what the object path must start with (e.g. "<project_id>/<user_id>/"), so a client
+    cannot attach another project's or user's file. Raises ValueError for a bad or missing object
+    and ConnectionError when storage itself fails (routes map it to 502).
+    """
+    path = path.lstrip("/")
+    if not path.startswith(prefix) or ".." in path:
+        raise ValueError("Invalid upload path")
+    try:
+        found = supabase.storage.from_(bucket).exists(path)
+    except Exception as e:
+        log.warning("exists %s/%s: %s", bucket, path, e)
+        raise ConnectionError("Could not check uploaded object") from e
+    if not found:
+        raise ValueError("Uploaded object not found")
+    schedule_stored_variants(supabase, bucket, path)
+    return path
@@ -0,0 +1,74 @@
+"""Process-wide Supabase client backed by one pooled HTTP connection set."""
+
+import logging
+import threading
+
+import httpx
+from supabase import Client, ClientOptions
+
+from app.core.config import Settings
+from app.core.constants import DB_SCHEMA
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_client: Client | None = None
+_http: httpx.Client | None = None
+
+
+class PooledClient(Client):
+    """Supabase client whose schema() reuses the pooled PostgREST client.
+
+    postgrest-py's schema() builds a fresh httpx client (and TLS connection) on every call;
+    all our tables live in DB_SCHEMA, so that schema is served by the client's own pooled postgrest.
+    """
+
+    def schema(self, schema: str):
+        if schema == self.options.schema:
+            return self.postgrest
+        return super().schema(schema)
+
+
+def _build_http_client(settings: Settings) -> httpx.Client:
+    limits = httpx.Limits(
+        max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY_SEC,
+    )
+    return httpx.Client(
+        limits=limits,
+        timeout=settings.SUPABASE_HTTP_TIMEOUT_SEC,
+        http2=settings.SUPABASE_HTTP2,
+        follow_redirects=True,
+    )
+
+
+def init_supabase_client(settings: Settings) -> Client:
+    """Create the shared client if needed and return it. Safe to call from several threads."""
+    global _client, _http
+    with _lock:
+        if _client is None:
+            _http = _build_http_client(settings)
+            options = ClientOptions(
+                schema=DB_SCHEMA,
+                httpx_client=_http,
+                auto_refresh_token=False,
+                persist_session=False,
+            )
+            _client = PooledClient(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY, options)
+            log.info(
+                "Supabase client pool ready (max_connections=%s, http2=%s)",
+                settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+                settings.SUPABASE_HTTP2,
+            )
+        return _client
+
+
+def close_supabase_client() -> None:
+    """Close pooled connections (app shutdown)."""
+    global _client, _http
+    with _lock:
+        if _http is not None:
+            _http.close()
+        _client = None
+        _http = None
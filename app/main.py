@@ -1,11 +1,18 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app.core.access import RequestScopeMiddleware
+from app.core.auth_tokens import get_jwks_cache
 from app.core.config import get_settings
+from app.core.fanout import shutdown_executor
+from app.core.media import shutdown_media_workers, start_media_sweeper
+from app.core.storage import bootstrap_buckets
+from app.core.supabase_client import close_supabase_client, init_supabase_client
 from app.modules.attendance import routes as attendance_routes
 from app.modules.constants import routes as constants_routes
 from app.modules.dashboard import routes as dashboard_routes
@@ -38,8 +45,26 @@ logging.basicConfig(
     format="%(levelname)s %(name)s %(message)s",
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if _settings.SUPABASE_URL and _settings.SUPABASE_SERVICE_ROLE_KEY:
+        supabase = init_supabase_client(_settings)
+        bootstrap_buckets(supabase)
+        start_media_sweeper(supabase)
+    if _settings.AUTH_LOCAL_JWT_VERIFY and _settings.SUPABASE_URL:
+        get_jwks_cache(_settings).start()
+    yield
+    if _settings.AUTH_LOCAL_JWT_VERIFY and _settings.SUPABASE_URL:
+        get_jwks_cache(_settings).stop()
+    shutdown_executor()
+    shutdown_media_workers()
+    close_supabase_client()
+
+
 _disable_docs = _settings.ENV == "production"
 app = FastAPI(
+    lifespan=lifespan,
     title="FieldOps API",
     version="0.1.0",
     docs_url=None if _disable_docs else "/docs",
@@ -64,6 +89,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestScopeMiddleware)
 
 app.include_router(health_routes.router, prefix="/health", tags=["health"])
 app.include_router(dashboard_routes.router, prefix="/api/v1/dashboard", tags=["dashboard"])
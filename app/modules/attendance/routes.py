@@ -2,8 +2,14 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 
 from app.core.dependencies import get_current_user, get_project_access, get_supabase_client
 from app.core.permissions import CAN_LOG_ATTENDANCE, CAN_VIEW_ATTENDANCE
-from app.modules.attendance.schemas import AttendanceResponse
-from app.modules.attendance.service import check_in as do_check_in, check_out as do_check_out, list_attendance, upload_selfie
+from app.modules.attendance.schemas import AttendanceFinalize, AttendanceResponse
+from app.modules.attendance.service import (
+    check_in as do_check_in,
+    check_out as do_check_out,
+    confirm_selfie,
+    list_attendance,
+    upload_selfie,
+)
 from supabase import Client
 
 router = APIRouter()
@@ -53,6 +59,43 @@ async def attendance_check_out(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/{project_id}/check-in/finalize", response_model=AttendanceResponse)
+def attendance_check_in_finalize(
+    project_id: str,
+    payload: AttendanceFinalize,
+    access: dict = Depends(get_project_access(CAN_LOG_ATTENDANCE)),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Check in with a selfie uploaded directly to storage (purpose attendance_selfie of /storage/upload-url)."""
+    user_id = current_user["id"]
+    try:
+        path = confirm_selfie(supabase, project_id, user_id, payload.date, "in", payload.selfie_path)
+        return do_check_in(supabase, project_id, user_id, payload.date, payload.lat, payload.lng, path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.post("/{project_id}/check-out/finalize", response_model=AttendanceResponse)
+def attendance_check_out_finalize(
+    project_id: str,
+    payload: AttendanceFinalize,
+    access: dict = Depends(get_project_access(CAN_LOG_ATTENDANCE)),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    user_id = current_user["id"]
+    try:
+        path = confirm_selfie(supabase, project_id, user_id, payload.date, "out", payload.selfie_path)
+        return do_check_out(supabase, project_id, user_id, payload.date, payload.lat, payload.lng, path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
 @router.get("/{project_id}", response_model=list[AttendanceResponse])
 def list_attendance_route(
     project_id: str,
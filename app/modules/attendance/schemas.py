@@ -11,6 +11,13 @@ class AttendanceCheckOut(BaseModel):
     lng: float
 
 
+class AttendanceFinalize(BaseModel):
+    date: str
+    lat: float
+    lng: float
+    selfie_path: str  # path returned by /storage/upload-url, after the client uploaded to it
+
+
 class AttendanceResponse(BaseModel):
     id: str
     project_id: str
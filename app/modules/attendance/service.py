@@ -1,9 +1,13 @@
+import uuid
+
 from fastapi import UploadFile
 from supabase import Client
 
 from app.core.constants import DB_SCHEMA
+from app.core.storage import confirm_upload, key_date, upload_object
 from app.modules.attendance.geo import haversine_meters
 from app.modules.attendance.schemas import AttendanceResponse
+from app.modules.dashboard.cache import invalidate_project_summaries
 from app.modules.users.service import get_profiles_by_ids
 
 
@@ -35,11 +39,28 @@ def get_project_location(supabase: Client, project_id: str) -> tuple[float | Non
         return None, None
 
 
+SELFIE_BUCKET = "attendance"
+
+
+def selfie_object_path(project_id: str, user_id: str, date: str, kind: str) -> str:
+    """Unique object path for a check-in/out selfie (kind "in" or "out"). Raises ValueError for a bad date."""
+    date = key_date(date)
+    return f"attendance/{project_id}/{user_id}/{date}_{kind}_{uuid.uuid4().hex}.jpg"
+
+
+def confirm_selfie(supabase: Client, project_id: str, user_id: str, date: str, kind: str, path: str) -> str:
+    """Verify a selfie the client uploaded through a signed upload URL for this date and kind ("in"/"out").
+
+    Raises ValueError (also for another day's or the other kind's selfie) or ConnectionError (see confirm_upload).
+    """
+    date = key_date(date)
+    return confirm_upload(supabase, SELFIE_BUCKET, path, f"attendance/{project_id}/{user_id}/{date}_{kind}_")
+
+
 def upload_selfie(supabase: Client, project_id: str, user_id: str, date: str, kind: str, file: UploadFile) -> str:
-    path = f"attendance/{project_id}/{user_id}/{date}_{kind}.jpg"
+    path = selfie_object_path(project_id, user_id, date, kind)
     content = file.file.read()
-    supabase.storage.from_("attendance").upload(path, content, file_options={"content-type": file.content_type or "image/jpeg"})
-    return path
+    return upload_object(supabase, SELFIE_BUCKET, path, content, file.content_type or "image/jpeg")
 
 
 def get_or_create_attendance(supabase: Client, project_id: str, user_id: str, date: str) -> dict:
@@ -77,6 +98,7 @@ def check_in(supabase: Client, project_id: str, user_id: str, date: str, lat: fl
     data = (up.data or [None])[0] if up else None
     if not data:
         raise ValueError("Failed to update attendance")
+    invalidate_project_summaries(project_id)
     return AttendanceResponse(**data)
 
 
@@ -108,6 +130,7 @@ def check_out(supabase: Client, project_id: str, user_id: str, date: str, lat: f
     data = (up.data or [None])[0] if up else None
     if not data:
         raise ValueError("Failed to update attendance")
+    invalidate_project_summaries(project_id)
     return AttendanceResponse(**data)
 
 
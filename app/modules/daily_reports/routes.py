@@ -3,21 +3,27 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Upload
 from app.core.dependencies import get_current_user, get_project_access, get_project_access_query, get_supabase_client, get_tenant_id
 from app.core.permissions import CAN_MANAGE_DAILY_REPORTS, CAN_VIEW_DAILY_REPORTS
 from app.modules.daily_reports.schemas import (
-    DailyReportDayAggregate,
+    DailyReportDayCount,
     DailyReportEntryCreate,
     DailyReportEntryResponse,
+    DailyReportEntryWithUser,
     DailyReportListResponse,
+    DailyReportPhotoFinalize,
     DailyReportResponse,
     DailyReportsByDateRangeResponse,
 )
 from app.modules.daily_reports.service import (
+    MAX_RANGE_PAGE_DAYS,
     append_entry,
+    count_by_date_range,
+    finalize_photo,
     get_or_create_report,
     get_report_by_id,
     get_report_with_entries,
     list_all_entries_for_project_date,
     list_by_date_range,
     list_entries,
+    list_entries_with_user,
     list_recent_dates_with_reports,
     list_reports_for_project_date,
     upload_photo,
@@ -43,12 +49,31 @@ def by_date_range_route(
     project_id: str = Query(..., description="Project ID"),
     date_from: str = Query(..., description="Start date YYYY-MM-DD"),
     date_to: str = Query(..., description="End date YYYY-MM-DD"),
+    days: int = Query(MAX_RANGE_PAGE_DAYS, ge=1, le=MAX_RANGE_PAGE_DAYS, description="Days per page"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
     access: dict = Depends(get_project_access_query(CAN_VIEW_DAILY_REPORTS)),
     supabase: Client = Depends(get_supabase_client),
 ):
-    """Entries per date in range with user_id for attribution. Only dates with reports."""
-    by_date = list_by_date_range(supabase, project_id, date_from, date_to)
-    return DailyReportsByDateRangeResponse(by_date=by_date)
+    """Entries per date with user_id for attribution, newest first, paged by windows of days. Only dates with reports."""
+    try:
+        return list_by_date_range(supabase, project_id, date_from, date_to, days, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/by-date-range/counts", response_model=list[DailyReportDayCount])
+def counts_by_date_range_route(
+    project_id: str = Query(..., description="Project ID"),
+    date_from: str = Query(..., description="Start date YYYY-MM-DD"),
+    date_to: str = Query(..., description="End date YYYY-MM-DD"),
+    access: dict = Depends(get_project_access_query(CAN_VIEW_DAILY_REPORTS)),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Counts per date for calendar heatmaps (no entry content)."""
+    try:
+        return count_by_date_range(supabase, project_id, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/list", response_model=list[DailyReportListResponse])
@@ -97,7 +122,7 @@ def get_my_report(
     return report
 
 
-@router.get("/{project_id}/entries", response_model=list[DailyReportEntryResponse])
+@router.get("/{project_id}/entries", response_model=list[DailyReportEntryWithUser])
 def list_report_entries(
     project_id: str,
     report_date: str,
@@ -108,7 +133,7 @@ def list_report_entries(
     if access.get("role") == "admin":
         return list_all_entries_for_project_date(supabase, project_id, report_date)
     report = get_or_create_report(supabase, project_id, current_user["id"], report_date)
-    return list_entries(supabase, report["id"])
+    return list_entries_with_user(supabase, report)
 
 
 @router.post("/{project_id}/entries", response_model=DailyReportEntryResponse, status_code=201)
@@ -134,6 +159,28 @@ async def add_report_photo(
     supabase: Client = Depends(get_supabase_client),
 ):
     report = get_or_create_report(supabase, project_id, current_user["id"], report_date)
-    count = len(list_entries(supabase, report["id"]))
-    path = upload_photo(supabase, project_id, current_user["id"], report_date, count, photo)
+    path = upload_photo(supabase, project_id, current_user["id"], report_date, photo)
     return append_entry(supabase, report["id"], "photo", path, sort_order)
+
+
+@router.post("/{project_id}/entries/photo/finalize", response_model=DailyReportEntryResponse, status_code=201)
+def finalize_report_photo(
+    project_id: str,
+    payload: DailyReportPhotoFinalize,
+    access: dict = Depends(get_project_access(CAN_MANAGE_DAILY_REPORTS)),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Record a photo uploaded directly to storage (purpose daily_report_photo of /storage/upload-url).
+
+    The photo must have been uploaded for the same report_date. Safe to retry: finalizing the same
+    path again returns the entry already recorded.
+    """
+    try:
+        return finalize_photo(
+            supabase, project_id, current_user["id"], payload.report_date, payload.path, payload.sort_order
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
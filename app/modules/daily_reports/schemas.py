@@ -24,6 +24,12 @@ class DailyReportEntryCreate(BaseModel):
     sort_order: int = 0
 
 
+class DailyReportPhotoFinalize(BaseModel):
+    report_date: str  # YYYY-MM-DD
+    path: str  # path returned by /storage/upload-url, after the client uploaded to it
+    sort_order: int = 0
+
+
 class DailyReportEntryResponse(BaseModel):
     id: str
     daily_report_id: str
@@ -50,3 +56,11 @@ class DailyReportDayAggregate(BaseModel):
 
 class DailyReportsByDateRangeResponse(BaseModel):
     by_date: dict[str, DailyReportDayAggregate]
+    next_cursor: str | None = None  # pass as ?cursor= for the next (older) window of days
+
+
+class DailyReportDayCount(BaseModel):
+    report_date: str
+    report_count: int
+    photo_count: int
+    note_count: int
@@ -1,32 +1,30 @@
 import logging
+import uuid
+from datetime import date, timedelta
 
 from fastapi import UploadFile
+from postgrest.exceptions import APIError
 from supabase import Client
 
 from app.core.constants import DB_SCHEMA
+from app.core.storage import confirm_upload, key_date, upload_object
 from app.modules.daily_reports.schemas import (
     DailyReportDayAggregate,
+    DailyReportDayCount,
     DailyReportEntryResponse,
     DailyReportEntryWithUser,
     DailyReportResponse,
+    DailyReportsByDateRangeResponse,
 )
 
 DAILY_REPORTS_BUCKET = "daily_reports"
+MAX_RANGE_PAGE_DAYS = 31
+MAX_COUNT_RANGE_DAYS = 366
+RANGE_FETCH_ROWS = 1000  # PostgREST's default max-rows
 log = logging.getLogger(__name__)
 
 
-def _ensure_bucket(supabase: Client, bucket: str) -> None:
-    try:
-        buckets = supabase.storage.list_buckets()
-        names = [b.get("name") for b in (buckets or []) if isinstance(b, dict)]
-        if bucket not in names:
-            supabase.storage.create_bucket(bucket, options={"public": False})
-            log.info("Created storage bucket: %s", bucket)
-    except Exception as e:
-        log.warning("Could not ensure bucket %s: %s", bucket, e)
-
-
-def get_or_create_report(supabase: Client, project_id: str, user_id: str, report_date: str) -> dict:
+def get_report(supabase: Client, project_id: str, user_id: str, report_date: str) -> dict | None:
     r = (
         supabase.schema(DB_SCHEMA).table("daily_reports")
         .select("*")
@@ -38,6 +36,13 @@ def get_or_create_report(supabase: Client, project_id: str, user_id: str, report
     )
     if r is not None and getattr(r, "data", None) not in (None, []):
         return r.data if isinstance(r.data, dict) else (r.data or [{}])[0]
+    return None
+
+
+def get_or_create_report(supabase: Client, project_id: str, user_id: str, report_date: str) -> dict:
+    report = get_report(supabase, project_id, user_id, report_date)
+    if report:
+        return report
     ins = (
         supabase.schema(DB_SCHEMA).table("daily_reports")
         .insert({"project_id": project_id, "user_id": user_id, "report_date": report_date})
@@ -49,16 +54,63 @@ def get_or_create_report(supabase: Client, project_id: str, user_id: str, report
     return data
 
 
-def upload_photo(supabase: Client, project_id: str, user_id: str, report_date: str, index: int, file: UploadFile) -> str:
-    _ensure_bucket(supabase, DAILY_REPORTS_BUCKET)
-    path = f"{project_id}/{user_id}/{report_date}_{index}.jpg"
+def photo_object_path(project_id: str, user_id: str, report_date: str) -> str:
+    """Unique object path for a report photo, so concurrent uploads never collide. Raises ValueError for a bad date."""
+    report_date = key_date(report_date, "report_date")
+    return f"{project_id}/{user_id}/{report_date}_{uuid.uuid4().hex}.jpg"
+
+
+def upload_photo(supabase: Client, project_id: str, user_id: str, report_date: str, file: UploadFile) -> str:
+    path = photo_object_path(project_id, user_id, report_date)
     file.file.seek(0)
     content = file.file.read()
     if not content:
         raise ValueError("Photo file is empty")
-    opts = {"content-type": file.content_type or "image/jpeg", "upsert": "true"}
-    supabase.storage.from_(DAILY_REPORTS_BUCKET).upload(path, content, file_options=opts)
-    return path
+    return upload_object(supabase, DAILY_REPORTS_BUCKET, path, content, file.content_type or "image/jpeg")
+
+
+def get_photo_entry(supabase: Client, daily_report_id: str, path: str) -> DailyReportEntryResponse | None:
+    r = (
+        supabase.schema(DB_SCHEMA).table("daily_report_entries")
+        .select("*")
+        .eq("daily_report_id", daily_report_id)
+        .eq("type", "photo")
+        .eq("content", path)
+        .limit(1)
+        .execute()
+    )
+    row = (r.data or [None])[0]
+    return DailyReportEntryResponse(**row) if row else None
+
+
+def finalize_photo(
+    supabase: Client, project_id: str, user_id: str, report_date: str, path: str, sort_order: int = 0
+) -> DailyReportEntryResponse:
+    """Record a photo the client uploaded through a signed upload URL. Raises ValueError if it is not there.
+
+    The photo must have been uploaded for this report_date ("<project>/<user>/<date>_..."). Its path is
+    the idempotency key (unique per report): a retried finalize returns the entry recorded by the first call.
+    """
+    report_date = key_date(report_date, "report_date")
+    prefix = f"{project_id}/{user_id}/{report_date}_"
+    path = path.lstrip("/")
+    if not path.startswith(prefix):
+        raise ValueError("Invalid upload path")
+    # Look up without creating: an empty report would show up as a day in the range view
+    report = get_report(supabase, project_id, user_id, report_date)
+    existing = get_photo_entry(supabase, report["id"], path) if report else None
+    if existing:
+        return existing
+    path = confirm_upload(supabase, DAILY_REPORTS_BUCKET, path, prefix)
+    report = report or get_or_create_report(supabase, project_id, user_id, report_date)
+    try:
+        return append_entry(supabase, report["id"], "photo", path, sort_order)
+    except APIError as e:
+        # A concurrent retry inserted first
+        existing = get_photo_entry(supabase, report["id"], path) if e.code == "23505" else None
+        if not existing:
+            raise
+        return existing
 
 
 def append_entry(supabase: Client, daily_report_id: str, type_: str, content: str, sort_order: int = 0) -> DailyReportEntryResponse:
@@ -118,16 +170,29 @@ def list_reports_for_project_date(supabase: Client, project_id: str, report_date
     return list(r.data or [])
 
 
+def _entry_with_user(row: dict) -> DailyReportEntryWithUser:
+    """Flatten an entry row with its embedded daily_reports(user_id, ...) into an attributed entry."""
+    report = row.pop("daily_reports", None) or {}
+    return DailyReportEntryWithUser(**row, user_id=str(report.get("user_id") or ""))
+
+
 def list_all_entries_for_project_date(
     supabase: Client, project_id: str, report_date: str
-) -> list[DailyReportEntryResponse]:
-    """List entries from all daily reports for a project on a given date (admin view)."""
-    reports = list_reports_for_project_date(supabase, project_id, report_date)
-    all_entries: list[DailyReportEntryResponse] = []
-    for report in reports:
-        all_entries.extend(list_entries(supabase, report["id"]))
-    all_entries.sort(key=lambda e: (e.sort_order, e.created_at or ""))
-    return all_entries
+) -> list[DailyReportEntryWithUser]:
+    """List entries from all daily reports for a project on a given date, with authors (admin view).
+
+    One query: entries inner-joined to their report, filtered on the report's project and date.
+    """
+    r = (
+        supabase.schema(DB_SCHEMA).table("daily_report_entries")
+        .select("*, daily_reports!inner(user_id)")
+        .eq("daily_reports.project_id", project_id)
+        .eq("daily_reports.report_date", report_date)
+        .order("sort_order")
+        .order("created_at")
+        .execute()
+    )
+    return [_entry_with_user(row) for row in (r.data or [])]
 
 
 def list_reports_for_project_date_range(
@@ -160,29 +225,83 @@ def list_entries_with_user(
     ]
 
 
+def _parse_day(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def _fetch_range_entries(supabase: Client, project_id: str, day_from: date, day_to: date) -> list[dict]:
+    """All entries of the project's reports in [day_from, day_to], joined to their report, in row-limit sized chunks."""
+    rows: list[dict] = []
+    while True:
+        r = (
+            supabase.schema(DB_SCHEMA).table("daily_report_entries")
+            .select("*, daily_reports!inner(user_id, report_date)")
+            .eq("daily_reports.project_id", project_id)
+            .gte("daily_reports.report_date", day_from.isoformat())
+            .lte("daily_reports.report_date", day_to.isoformat())
+            .order("sort_order")
+            .order("created_at")
+            .order("id")
+            .range(len(rows), len(rows) + RANGE_FETCH_ROWS - 1)
+            .execute()
+        )
+        chunk = list(r.data or [])
+        rows.extend(chunk)
+        if len(chunk) < RANGE_FETCH_ROWS:
+            return rows
+
+
 def list_by_date_range(
+    supabase: Client,
+    project_id: str,
+    date_from: str,
+    date_to: str,
+    days: int = MAX_RANGE_PAGE_DAYS,
+    cursor: str | None = None,
+) -> DailyReportsByDateRangeResponse:
+    """Entries per date (photos and notes with user_id), newest day first, one window of days per page.
+
+    A page covers at most `days` calendar days ending at the cursor (or date_to); every date with a report
+    appears, with empty lists if its reports have no entries yet. Raises ValueError on bad dates or cursor.
+    """
+    first = _parse_day(date_from, "date_from")
+    last = _parse_day(cursor, "cursor") if cursor else _parse_day(date_to, "date_to")
+    if cursor and not first <= last <= _parse_day(date_to, "date_to"):
+        raise ValueError("cursor outside the requested range")
+    if last < first:
+        return DailyReportsByDateRangeResponse(by_date={})
+    window_start = max(first, last - timedelta(days=min(days, MAX_RANGE_PAGE_DAYS) - 1))
+
+    reports = list_reports_for_project_date_range(supabase, project_id, window_start.isoformat(), last.isoformat())
+    by_date: dict[str, dict[str, list[DailyReportEntryWithUser]]] = {
+        str(report["report_date"]): {"photo": [], "note": []} for report in reports
+    }
+    for row in _fetch_range_entries(supabase, project_id, window_start, last):
+        day = str((row.get("daily_reports") or {}).get("report_date"))
+        entry = _entry_with_user(row)
+        bucket = by_date.setdefault(day, {"photo": [], "note": []})
+        bucket.setdefault(entry.type, []).append(entry)
+    result = {
+        day: DailyReportDayAggregate(photos=by_date[day]["photo"], notes=by_date[day]["note"])
+        for day in sorted(by_date, reverse=True)
+    }
+    next_cursor = (window_start - timedelta(days=1)).isoformat() if window_start > first else None
+    return DailyReportsByDateRangeResponse(by_date=result, next_cursor=next_cursor)
+
+
+def count_by_date_range(
     supabase: Client, project_id: str, date_from: str, date_to: str
-) -> dict[str, DailyReportDayAggregate]:
-    """Entries per date in range (photos and notes with user_id). Only dates with at least one report."""
-    reports = list_reports_for_project_date_range(
-        supabase, project_id, date_from, date_to
-    )
-    by_date: dict[str, list[DailyReportEntryWithUser]] = {}
-    for report in reports:
-        report_date = report.get("report_date")
-        if not report_date:
-            continue
-        date_str = str(report_date)
-        if date_str not in by_date:
-            by_date[date_str] = []
-        by_date[date_str].extend(list_entries_with_user(supabase, report))
-    result: dict[str, DailyReportDayAggregate] = {}
-    for date_str, entries in by_date.items():
-        entries.sort(key=lambda e: (e.sort_order, e.created_at or ""))
-        photos = [e for e in entries if e.type == "photo"]
-        notes = [e for e in entries if e.type == "note"]
-        result[date_str] = DailyReportDayAggregate(photos=photos, notes=notes)
-    return result
+) -> list[DailyReportDayCount]:
+    """Reports, photos and notes per day (newest first), grouped in the database. Raises ValueError on bad dates."""
+    first, last = _parse_day(date_from, "date_from"), _parse_day(date_to, "date_to")
+    if (last - first).days >= MAX_COUNT_RANGE_DAYS:
+        raise ValueError(f"Range must be at most {MAX_COUNT_RANGE_DAYS} days")
+    params = {"p_project_id": project_id, "p_from": first.isoformat(), "p_to": last.isoformat()}
+    r = supabase.schema(DB_SCHEMA).rpc("daily_report_counts", params).execute()
+    return [DailyReportDayCount(**{**row, "report_date": str(row["report_date"])}) for row in (r.data or [])]
 
 
 def list_recent_dates_with_reports(
@@ -0,0 +1,128 @@
+"""Per-(tenant, user, role) dashboard summary cache with write-driven invalidation.
+
+Entries are fresh for DASHBOARD_CACHE_TTL_SEC. After expiry or invalidation an entry may still be
+served for up to DASHBOARD_CACHE_STALE_SEC while a single background refresh recomputes it.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+from app.core.config import get_settings
+from app.modules.dashboard.schemas import DashboardSummaryResponse
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    value: DashboardSummaryResponse
+    computed_at: float
+    project_ids: frozenset[str]
+    stale_since: float | None = None
+    refreshing: bool = False
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    invalidations: int = 0
+
+
+class SummaryCache:
+    def __init__(self, ttl_sec: float, stale_sec: float):
+        self.ttl_sec = ttl_sec
+        self.stale_sec = stale_sec
+        self.stats = CacheStats()
+        self._entries: dict[Hashable, _Entry] = {}
+        self._invalidated_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], DashboardSummaryResponse]) -> DashboardSummaryResponse:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stale_since = entry.stale_since
+                if stale_since is None and now - entry.computed_at >= self.ttl_sec:
+                    stale_since = entry.computed_at + self.ttl_sec
+                if stale_since is None:
+                    self.stats.hits += 1
+                    return entry.value
+                if now - stale_since <= self.stale_sec:
+                    self.stats.stale_hits += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        threading.Thread(target=self._refresh, args=(key, compute), daemon=True).start()
+                    return entry.value
+            self.stats.misses += 1
+        started = time.monotonic()
+        value = compute()
+        self._store(key, value, started)
+        return value
+
+    def invalidate_project(self, project_id: str) -> None:
+        """Mark every summary that includes project_id stale."""
+        pid = str(project_id)
+        now = time.monotonic()
+        with self._lock:
+            self.stats.invalidations += 1
+            self._invalidated_at[pid] = now
+            for entry in self._entries.values():
+                if pid in entry.project_ids and entry.stale_since is None:
+                    entry.stale_since = now
+
+    def _refresh(self, key: Hashable, compute: Callable[[], DashboardSummaryResponse]) -> None:
+        started = time.monotonic()
+        try:
+            value = compute()
+        except Exception as e:
+            log.warning("Dashboard summary refresh failed for %s: %s", key, e)
+            with self._lock:
+                self.stats.refresh_errors += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            return
+        with self._lock:
+            self.stats.refreshes += 1
+        self._store(key, value, started)
+
+    def _store(self, key: Hashable, value: DashboardSummaryResponse, started: float) -> None:
+        project_ids = frozenset(p.project_id for p in value.projects)
+        now = time.monotonic()
+        with self._lock:
+            # A write that landed while we were computing makes the result stale immediately
+            stale_since = now if any(self._invalidated_at.get(pid, 0.0) > started for pid in project_ids) else None
+            self._entries[key] = _Entry(value=value, computed_at=now, project_ids=project_ids, stale_since=stale_since)
+            horizon = now - self.ttl_sec - self.stale_sec
+            for pid in [p for p, t in self._invalidated_at.items() if t < horizon]:
+                del self._invalidated_at[pid]
+            for k in [k for k, e in self._entries.items() if e.computed_at < horizon]:
+                del self._entries[k]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.stats.hits,
+                "stale_hits": self.stats.stale_hits,
+                "misses": self.stats.misses,
+                "refreshes": self.stats.refreshes,
+                "refresh_errors": self.stats.refresh_errors,
+                "invalidations": self.stats.invalidations,
+            }
+
+
+_settings = get_settings()
+summary_cache = SummaryCache(_settings.DASHBOARD_CACHE_TTL_SEC, _settings.DASHBOARD_CACHE_STALE_SEC)
+
+
+def invalidate_project_summaries(project_id: str) -> None:
+    summary_cache.invalidate_project(project_id)
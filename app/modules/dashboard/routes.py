@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
-from app.core.dependencies import get_current_user, get_supabase_client, get_tenant_id, get_tenant_membership
-from app.modules.dashboard.schemas import DashboardSummaryResponse
-from app.modules.dashboard.service import get_dashboard_summary
+from app.core.dependencies import get_current_user, get_supabase_client, get_tenant_id, get_tenant_membership, require_tenant_org_admin
+from app.modules.dashboard.cache import summary_cache
+from app.modules.dashboard.schemas import DashboardCacheStatsResponse, DashboardSummaryResponse
+from app.modules.dashboard.service import get_cached_dashboard_summary
 from supabase import Client
 
 router = APIRouter()
@@ -15,4 +16,15 @@ def dashboard_summary(
     supabase: Client = Depends(get_supabase_client),
 ):
     role = get_tenant_membership(tenant_id, current_user["id"], supabase)
-    return get_dashboard_summary(supabase, tenant_id, current_user["id"], tenant_role=role)
+    try:
+        return get_cached_dashboard_summary(supabase, tenant_id, current_user["id"], tenant_role=role)
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+@router.get("/cache-stats", response_model=DashboardCacheStatsResponse)
+def dashboard_cache_stats(
+    tenant_id: str = Depends(require_tenant_org_admin),
+):
+    """Hit/miss counters of this instance's summary cache."""
+    return DashboardCacheStatsResponse(**summary_cache.snapshot())
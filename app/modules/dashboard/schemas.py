@@ -18,3 +18,13 @@ class DashboardSummaryResponse(BaseModel):
     total_wallet_balance: float = 0
     total_tasks: int = 0
     total_due_tasks: int = 0
+
+
+class DashboardCacheStatsResponse(BaseModel):
+    entries: int = 0
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    invalidations: int = 0
@@ -1,30 +1,71 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
 
 from app.core.dependencies import get_current_user, get_project_access, get_supabase_client
+from app.core.pagination import MAX_PAGE_SIZE
 from app.core.permissions import CAN_MANAGE_EXPENSE, CAN_VIEW_EXPENSE
-from app.modules.expense.schemas import ExpenseCreditCreate, ExpenseTransactionResponse, WalletBalanceResponse
-from app.modules.expense.service import add_credit, add_debit, get_balance, list_transactions
+from app.core.storage import upload_object
+from app.modules.expense.schemas import (
+    ExpenseCreditCreate,
+    ExpenseDebitFinalize,
+    ExpenseTransactionPage,
+    ExpenseTransactionResponse,
+    WalletBalanceOnlyResponse,
+    WalletBalanceResponse,
+)
+from app.modules.expense.service import (
+    RECEIPT_BUCKET,
+    add_credit,
+    add_debit,
+    finalize_debit,
+    get_balance,
+    list_transactions,
+    receipt_object_path,
+)
 from supabase import Client
 
 router = APIRouter()
 
 
-def upload_receipt(supabase: Client, project_id: str, txn_id_placeholder: str, file: UploadFile) -> str:
-    path = f"expense/{project_id}/{txn_id_placeholder}_{file.filename or 'receipt.jpg'}"
+def upload_receipt(supabase: Client, project_id: str, file: UploadFile) -> str:
+    path = receipt_object_path(project_id, file.filename)
     content = file.file.read()
-    supabase.storage.from_("expense").upload(path, content, file_options={"content-type": file.content_type or "image/jpeg"})
-    return path
+    return upload_object(supabase, RECEIPT_BUCKET, path, content, file.content_type or "image/jpeg")
 
 
 @router.get("/{project_id}", response_model=WalletBalanceResponse)
 def get_wallet(
     project_id: str,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     access: dict = Depends(get_project_access(CAN_VIEW_EXPENSE)),
     supabase: Client = Depends(get_supabase_client),
 ):
+    """Balance plus the latest page of transactions; older pages via /transactions?cursor=next_cursor."""
     balance = get_balance(supabase, project_id)
-    transactions = list_transactions(supabase, project_id)
-    return WalletBalanceResponse(balance=balance, transactions=transactions)
+    page = list_transactions(supabase, project_id, limit)
+    return WalletBalanceResponse(balance=balance, transactions=page.transactions, next_cursor=page.next_cursor)
+
+
+@router.get("/{project_id}/balance", response_model=WalletBalanceOnlyResponse)
+def get_wallet_balance(
+    project_id: str,
+    access: dict = Depends(get_project_access(CAN_VIEW_EXPENSE)),
+    supabase: Client = Depends(get_supabase_client),
+):
+    return WalletBalanceOnlyResponse(balance=get_balance(supabase, project_id))
+
+
+@router.get("/{project_id}/transactions", response_model=ExpenseTransactionPage)
+def list_transactions_route(
+    project_id: str,
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    access: dict = Depends(get_project_access(CAN_VIEW_EXPENSE)),
+    supabase: Client = Depends(get_supabase_client),
+):
+    try:
+        return list_transactions(supabase, project_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/{project_id}/credit", response_model=ExpenseTransactionResponse, status_code=201)
@@ -48,7 +89,25 @@ async def create_debit(
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client),
 ):
-    import uuid
-    key = str(uuid.uuid4())
-    path = upload_receipt(supabase, project_id, key, receipt)
+    path = upload_receipt(supabase, project_id, receipt)
     return add_debit(supabase, project_id, amount, path, notes, current_user["id"])
+
+
+@router.post("/{project_id}/debit/finalize", response_model=ExpenseTransactionResponse, status_code=201)
+def finalize_debit_route(
+    project_id: str,
+    payload: ExpenseDebitFinalize,
+    access: dict = Depends(get_project_access(CAN_MANAGE_EXPENSE)),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Record a debit whose receipt was uploaded directly to storage (purpose expense_receipt of /storage/upload-url).
+
+    Safe to retry: finalizing the same receipt_path again returns the debit already recorded.
+    """
+    try:
+        return finalize_debit(supabase, project_id, payload.amount, payload.receipt_path, payload.notes, current_user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
@@ -23,6 +23,22 @@ class ExpenseTransactionResponse(BaseModel):
     created_by: str | None = None
 
 
+class ExpenseDebitFinalize(BaseModel):
+    amount: float
+    notes: str | None = None
+    receipt_path: str  # path returned by /storage/upload-url, after the client uploaded to it
+
+
+class ExpenseTransactionPage(BaseModel):
+    transactions: list[ExpenseTransactionResponse]
+    next_cursor: str | None = None  # pass as ?cursor= for the next (older) page
+
+
+class WalletBalanceOnlyResponse(BaseModel):
+    balance: float
+
+
 class WalletBalanceResponse(BaseModel):
     balance: float
-    transactions: list[ExpenseTransactionResponse]
+    transactions: list[ExpenseTransactionResponse]  # first page, newest first
+    next_cursor: str | None = None
@@ -1,24 +1,53 @@
-from decimal import Decimal
+import uuid
+
+from postgrest.exceptions import APIError
 from supabase import Client
 
 from app.core.constants import DB_SCHEMA
-from app.modules.expense.schemas import ExpenseTransactionResponse, WalletBalanceResponse
+from app.core.pagination import keyset_before, split_page
+from app.core.storage import confirm_upload
+from app.modules.dashboard.cache import invalidate_project_summaries
+from app.modules.expense.schemas import ExpenseTransactionPage, ExpenseTransactionResponse
+
+
+RECEIPT_BUCKET = "expense"
+
+
+def receipt_object_path(project_id: str, filename: str | None) -> str:
+    name = (filename or "receipt.jpg").rsplit("/", 1)[-1] or "receipt.jpg"
+    return f"expense/{project_id}/{uuid.uuid4()}_{name}"
+
 
+def confirm_receipt(supabase: Client, project_id: str, path: str) -> str:
+    """Verify a receipt the client uploaded through a signed upload URL. Raises ValueError."""
+    return confirm_upload(supabase, RECEIPT_BUCKET, path, f"expense/{project_id}/")
 
-def list_transactions(supabase: Client, project_id: str) -> list[ExpenseTransactionResponse]:
-    r = supabase.schema(DB_SCHEMA).table("expense_transactions").select("*").eq("project_id", project_id).order("created_at", desc=True).execute()
-    return [ExpenseTransactionResponse(**row) for row in (r.data or [])]
+
+def list_transactions(
+    supabase: Client, project_id: str, limit: int = 20, cursor: str | None = None
+) -> ExpenseTransactionPage:
+    """One page of transactions, newest first (keyset on created_at, id). Raises ValueError on a bad cursor."""
+    query = (
+        supabase.schema(DB_SCHEMA)
+        .table("expense_transactions")
+        .select("*")
+        .eq("project_id", project_id)
+    )
+    if cursor:
+        query = query.or_(keyset_before(cursor))
+    r = query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute()
+    rows, next_cursor = split_page(list(r.data or []), limit)
+    return ExpenseTransactionPage(
+        transactions=[ExpenseTransactionResponse(**row) for row in rows],
+        next_cursor=next_cursor,
+    )
 
 
 def get_balance(supabase: Client, project_id: str) -> float:
-    r = supabase.schema(DB_SCHEMA).table("expense_transactions").select("type, amount").eq("project_id", project_id).execute()
-    total = Decimal("0")
-    for row in r.data or []:
-        if row["type"] == "credit":
-            total += Decimal(str(row["amount"]))
-        else:
-            total -= Decimal(str(row["amount"]))
-    return float(total)
+    """Maintained wallet balance (project_wallets is kept in sync by a trigger on expense_transactions)."""
+    r = supabase.schema(DB_SCHEMA).table("project_wallets").select("balance").eq("project_id", project_id).limit(1).execute()
+    row = (r.data or [None])[0]
+    return float(row["balance"]) if row else 0.0
 
 
 def add_credit(supabase: Client, project_id: str, amount: float, notes: str | None, created_by: str) -> ExpenseTransactionResponse:
@@ -27,6 +56,7 @@ def add_credit(supabase: Client, project_id: str, amount: float, notes: str | No
     data = (r.data or [None])[0]
     if not data:
         raise ValueError("Insert did not return row")
+    invalidate_project_summaries(project_id)
     return ExpenseTransactionResponse(**data)
 
 
@@ -43,4 +73,42 @@ def add_debit(supabase: Client, project_id: str, amount: float, receipt_path: st
     data = (r.data or [None])[0]
     if not data:
         raise ValueError("Insert did not return row")
+    invalidate_project_summaries(project_id)
     return ExpenseTransactionResponse(**data)
+
+
+def get_debit_by_receipt(supabase: Client, project_id: str, receipt_path: str) -> ExpenseTransactionResponse | None:
+    r = (
+        supabase.schema(DB_SCHEMA)
+        .table("expense_transactions")
+        .select("*")
+        .eq("project_id", project_id)
+        .eq("receipt_storage_path", receipt_path)
+        .limit(1)
+        .execute()
+    )
+    row = (r.data or [None])[0]
+    return ExpenseTransactionResponse(**row) if row else None
+
+
+def finalize_debit(
+    supabase: Client, project_id: str, amount: float, receipt_path: str, notes: str | None, created_by: str
+) -> ExpenseTransactionResponse:
+    """Record a debit for a directly uploaded receipt. Raises ValueError.
+
+    The receipt path is the idempotency key (unique in expense_transactions): a retried finalize
+    returns the debit recorded by the first call instead of charging the wallet twice.
+    """
+    receipt_path = receipt_path.lstrip("/")
+    existing = get_debit_by_receipt(supabase, project_id, receipt_path)
+    if existing:
+        return existing
+    path = confirm_receipt(supabase, project_id, receipt_path)
+    try:
+        return add_debit(supabase, project_id, amount, path, notes, created_by)
+    except APIError as e:
+        # A concurrent retry inserted first
+        existing = get_debit_by_receipt(supabase, project_id, path) if e.code == "23505" else None
+        if not existing:
+            raise
+        return existing
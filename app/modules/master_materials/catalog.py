@@ -0,0 +1,116 @@
+"""In-process per-tenant master-materials catalog with a prefix and trigram index for typeahead."""
+
+import re
+from bisect import bisect_left
+from collections import Counter
+
+from supabase import Client
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import get_settings
+from app.core.constants import DB_SCHEMA
+from app.modules.master_materials.schemas import MasterMaterialResponse
+
+TRIGRAM_MIN_SIMILARITY = 0.3  # same default as pg_trgm
+
+_WORD = re.compile(r"\w+")
+_catalogs = TTLCache(get_settings().CATALOG_CACHE_TTL_SEC)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.casefold()))
+
+
+def _trigrams(word: str) -> set[str]:
+    """pg_trgm-style trigrams of one word, padded with two leading spaces and one trailing."""
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TenantCatalog:
+    """Immutable snapshot of a tenant's catalog; rebuilt (not mutated) on invalidation."""
+
+    def __init__(self, items: list[MasterMaterialResponse]):
+        self.items = items  # created_at order, as listed
+        self.by_id = {item.id: item for item in items}
+        # (key, position) for the full name and every later word, so "cem" finds "Portland cement"
+        keys: list[tuple[str, int]] = []
+        # trigram postings per (position, word), for typo-tolerant matching against the best word
+        self._word_grams: dict[tuple[int, int], int] = {}
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        for pos, item in enumerate(items):
+            name = _normalize(item.name)
+            words = name.split(" ")
+            keys.append((name, pos))
+            keys.extend((word, pos) for word in words[1:])
+            for w, word in enumerate(words):
+                grams = _trigrams(word)
+                self._word_grams[(pos, w)] = len(grams)
+                for g in grams:
+                    self._postings.setdefault(g, []).append((pos, w))
+        keys.sort()
+        self._keys = keys
+
+    def _prefix_matches(self, prefix: str) -> list[int]:
+        found: list[int] = []
+        i = bisect_left(self._keys, (prefix, -1))
+        while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+            found.append(self._keys[i][1])
+            i += 1
+        return found
+
+    def search(self, query: str, limit: int = 20) -> list[MasterMaterialResponse]:
+        """Prefix matches (name first, then any word) ranked by name, then typo-tolerant matches.
+
+        The fuzzy part scores each entry by its best word's trigram similarity to the query's last word.
+        """
+        q = _normalize(query)
+        if not q:
+            return self.items[:limit]
+        prefix = sorted(
+            set(self._prefix_matches(q)),
+            key=lambda p: (not _normalize(self.items[p].name).startswith(q), self.items[p].name.casefold()),
+        )
+        results = prefix[:limit]
+        if len(results) < limit:
+            q_grams = _trigrams(q.split(" ")[-1])
+            shared = Counter(hit for g in q_grams for hit in self._postings.get(g, ()))
+            best: dict[int, float] = {}
+            for (pos, w), n in shared.items():
+                similarity = n / (len(q_grams) + self._word_grams[(pos, w)] - n)
+                if similarity >= TRIGRAM_MIN_SIMILARITY and similarity > best.get(pos, 0.0):
+                    best[pos] = similarity
+            seen = set(results)
+            scored = sorted((-sim, self.items[pos].name.casefold(), pos) for pos, sim in best.items() if pos not in seen)
+            results += [pos for _, _, pos in scored[: limit - len(results)]]
+        return [self.items[pos] for pos in results]
+
+
+def _load_catalog(supabase: Client, tenant_id: str) -> TenantCatalog:
+    r = (
+        supabase.schema(DB_SCHEMA)
+        .table("master_materials")
+        .select("*")
+        .eq("tenant_id", tenant_id)
+        .order("created_at")
+        .execute()
+    )
+    return TenantCatalog([MasterMaterialResponse(**row) for row in (r.data or [])])
+
+
+def get_catalog(supabase: Client, tenant_id: str) -> TenantCatalog:
+    catalog = _catalogs.get(tenant_id)
+    if catalog is MISSING:
+        catalog = _load_catalog(supabase, tenant_id)
+        _catalogs.set(tenant_id, catalog)
+    return catalog
+
+
+def peek_catalog(tenant_id: str) -> TenantCatalog | None:
+    """The cached catalog if this worker already has it, without loading it."""
+    catalog = _catalogs.get(tenant_id)
+    return None if catalog is MISSING else catalog
+
+
+def invalidate_catalog(tenant_id: str) -> None:
+    _catalogs.delete(tenant_id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.core.dependencies import (
     get_current_user,
@@ -10,13 +10,20 @@ from app.modules.master_materials.schemas import (
     MasterMaterialCreate,
     MasterMaterialResponse,
     MasterMaterialUpdate,
+    MasterMaterialUsageResponse,
+    UnitConversionResponse,
+    UnitConversionSet,
 )
 from app.modules.master_materials.service import (
     create_master_material,
     delete_master_material,
     get_master_material,
     list_master_materials,
+    master_material_usage,
+    list_unit_conversions,
     master_material_used_in_user_admin_projects,
+    search_master_materials,
+    set_unit_conversion,
     update_master_material,
 )
 from supabase import Client
@@ -36,7 +43,7 @@ def _can_edit_master_material(
     role = get_tenant_membership(tenant_id, current_user["id"], supabase)
     if role == "org_admin":
         return master_material_id
-    master = get_master_material(supabase, master_material_id, tenant_id)
+    master = get_master_material(supabase, master_material_id, tenant_id, cached=False)
     if not master:
         raise HTTPException(status_code=404, detail="Master material not found")
     if role == "member" or role is None:
@@ -54,6 +61,37 @@ def list_master_materials_route(
     return list_master_materials(supabase, tenant_id)
 
 
+@router.get("/search", response_model=list[MasterMaterialResponse])
+def search_master_materials_route(
+    q: str = Query("", description="Typed text; matches name/word prefixes, then similar names"),
+    limit: int = Query(20, ge=1, le=100),
+    tenant_id: str = Depends(get_tenant_id),
+    supabase: Client = Depends(get_supabase_client),
+):
+    return search_master_materials(supabase, tenant_id, q, limit)
+
+
+@router.get("/usage", response_model=list[MasterMaterialUsageResponse])
+def master_materials_usage_route(
+    tenant_id: str = Depends(require_tenant_org_admin),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Every catalog item with the projects using it and their stock on hand."""
+    return master_material_usage(supabase, tenant_id)
+
+
+@router.get("/{master_material_id}/usage", response_model=MasterMaterialUsageResponse)
+def master_material_usage_route(
+    master_material_id: str,
+    tenant_id: str = Depends(require_tenant_org_admin),
+    supabase: Client = Depends(get_supabase_client),
+):
+    usage = master_material_usage(supabase, tenant_id, [master_material_id])
+    if not usage:
+        raise HTTPException(status_code=404, detail="Master material not found")
+    return usage[0]
+
+
 @router.post("", response_model=MasterMaterialResponse, status_code=201)
 def create_master_material_route(
     payload: MasterMaterialCreate,
@@ -97,3 +135,32 @@ def delete_master_material_route(
         delete_master_material(supabase, master_material_id, tenant_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Master material not found")
+
+
+@router.get("/{master_material_id}/unit-conversions", response_model=list[UnitConversionResponse])
+def list_unit_conversions_route(
+    master_material_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    supabase: Client = Depends(get_supabase_client),
+):
+    if not get_master_material(supabase, master_material_id, tenant_id, cached=False):
+        raise HTTPException(status_code=404, detail="Master material not found")
+    return list_unit_conversions(supabase, master_material_id)
+
+
+@router.put("/{master_material_id}/unit-conversions", response_model=list[UnitConversionResponse])
+def set_unit_conversion_route(
+    master_material_id: str,
+    payload: UnitConversionSet,
+    _: str = Depends(_can_edit_master_material),
+    tenant_id: str = Depends(get_tenant_id),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Configure e.g. 1 roll = 50 m for this material; used by the cross-project stock rollup."""
+    if not get_master_material(supabase, master_material_id, tenant_id, cached=False):
+        raise HTTPException(status_code=404, detail="Master material not found")
+    try:
+        set_unit_conversion(supabase, master_material_id, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return list_unit_conversions(supabase, master_material_id)
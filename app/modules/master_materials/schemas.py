@@ -4,11 +4,13 @@ from pydantic import BaseModel
 class MasterMaterialCreate(BaseModel):
     name: str
     unit: str
+    reorder_threshold: float | None = None  # default for project materials created from this entry
 
 
 class MasterMaterialUpdate(BaseModel):
     name: str | None = None
     unit: str | None = None
+    reorder_threshold: float | None = None
 
 
 class MasterMaterialResponse(BaseModel):
@@ -16,4 +18,33 @@ class MasterMaterialResponse(BaseModel):
     tenant_id: str
     name: str
     unit: str
+    reorder_threshold: float | None = None
     created_at: str | None = None
+
+
+class MasterMaterialProjectUsage(BaseModel):
+    project_id: str
+    project_name: str
+    material_id: str
+    balance: float
+
+
+class MasterMaterialUsageResponse(BaseModel):
+    master_material_id: str
+    name: str
+    unit: str
+    total_on_hand: float
+    projects: list[MasterMaterialProjectUsage]
+
+
+class UnitConversionSet(BaseModel):
+    from_unit: str
+    to_unit: str
+    factor: float  # 1 from_unit = factor to_unit
+
+
+class UnitConversionResponse(BaseModel):
+    from_unit: str
+    to_unit: str
+    factor: float
+    master_material_id: str | None = None  # None: tenant-independent default (e.g. kg -> tonnes)
@@ -1,26 +1,37 @@
 from supabase import Client
 
-from app.core.constants import DB_SCHEMA
+from app.core.constants import DB_SCHEMA, MATERIAL_UNITS
+from app.modules.master_materials.catalog import get_catalog, invalidate_catalog, peek_catalog
 from app.modules.master_materials.schemas import (
     MasterMaterialCreate,
+    MasterMaterialProjectUsage,
     MasterMaterialResponse,
     MasterMaterialUpdate,
+    MasterMaterialUsageResponse,
+    UnitConversionResponse,
+    UnitConversionSet,
 )
 
 
 def list_master_materials(supabase: Client, tenant_id: str) -> list[MasterMaterialResponse]:
-    r = (
-        supabase.schema(DB_SCHEMA)
-        .table("master_materials")
-        .select("*")
-        .eq("tenant_id", tenant_id)
-        .order("created_at")
-        .execute()
-    )
-    return [MasterMaterialResponse(**row) for row in (r.data or [])]
+    return list(get_catalog(supabase, tenant_id).items)
+
+
+def search_master_materials(supabase: Client, tenant_id: str, q: str, limit: int = 20) -> list[MasterMaterialResponse]:
+    return get_catalog(supabase, tenant_id).search(q, limit)
 
 
-def get_master_material(supabase: Client, master_material_id: str, tenant_id: str) -> MasterMaterialResponse | None:
+def get_master_material(
+    supabase: Client, master_material_id: str, tenant_id: str, cached: bool = True
+) -> MasterMaterialResponse | None:
+    """One row from the table, or from the tenant catalog when this worker already holds it.
+
+    Never loads the catalog for a single lookup. Pass cached=False for edit and unit-conversion checks:
+    the catalog may still hold an entry deleted on another worker (up to CATALOG_CACHE_TTL_SEC).
+    """
+    catalog = peek_catalog(tenant_id) if cached else None
+    if catalog is not None and (hit := catalog.by_id.get(master_material_id)) is not None:
+        return hit
     r = (
         supabase.schema(DB_SCHEMA)
         .table("master_materials")
@@ -34,11 +45,14 @@ def get_master_material(supabase: Client, master_material_id: str, tenant_id: st
 
 
 def create_master_material(supabase: Client, tenant_id: str, payload: MasterMaterialCreate) -> MasterMaterialResponse:
-    row = {"tenant_id": tenant_id, "name": payload.name, "unit": payload.unit}
+    if payload.reorder_threshold is not None and payload.reorder_threshold < 0:
+        raise ValueError("reorder_threshold must not be negative")
+    row = {"tenant_id": tenant_id, "name": payload.name, "unit": payload.unit, "reorder_threshold": payload.reorder_threshold}
     r = supabase.schema(DB_SCHEMA).table("master_materials").insert(row).execute()
     row_out = (r.data or [None])[0]
     if not row_out:
         raise ValueError("Insert failed")
+    invalidate_catalog(tenant_id)
     return MasterMaterialResponse(**row_out)
 
 
@@ -46,6 +60,8 @@ def update_master_material(
     supabase: Client, master_material_id: str, tenant_id: str, payload: MasterMaterialUpdate
 ) -> MasterMaterialResponse:
     data = payload.model_dump(exclude_unset=True)
+    if (data.get("reorder_threshold") or 0) < 0:
+        raise ValueError("reorder_threshold must not be negative")
     r = (
         supabase.schema(DB_SCHEMA)
         .table("master_materials")
@@ -57,35 +73,80 @@ def update_master_material(
     row = (r.data or [None])[0]
     if not row:
         raise ValueError("Master material not found")
+    invalidate_catalog(tenant_id)
     return MasterMaterialResponse(**row)
 
 
 def delete_master_material(supabase: Client, master_material_id: str, tenant_id: str) -> None:
     supabase.schema(DB_SCHEMA).table("master_materials").delete().eq("id", master_material_id).eq("tenant_id", tenant_id).execute()
+    invalidate_catalog(tenant_id)
 
 
 def master_material_used_in_user_admin_projects(
     supabase: Client, master_material_id: str, user_id: str, tenant_id: str
 ) -> bool:
     """True if any project material links to this master and user is admin of that project."""
-    admin_projects = (
+    r = (
         supabase.schema(DB_SCHEMA)
-        .table("project_members")
-        .select("project_id")
-        .eq("user_id", user_id)
-        .eq("role", "admin")
+        .rpc(
+            "master_material_used_in_admin_projects",
+            {"p_master_material_id": master_material_id, "p_user_id": user_id},
+        )
         .execute()
     )
-    project_ids = [r["project_id"] for r in (admin_projects.data or [])]
-    if not project_ids:
-        return False
-    used = (
+    return bool(r.data)
+
+
+def master_material_usage(
+    supabase: Client, tenant_id: str, master_material_ids: list[str] | None = None
+) -> list[MasterMaterialUsageResponse]:
+    """Projects using each catalog item with stock on hand, from one RPC; unused items are listed with no projects."""
+    params = {"p_tenant_id": tenant_id, "p_master_material_ids": master_material_ids}
+    r = supabase.schema(DB_SCHEMA).rpc("master_material_usage", params).execute()
+    by_master: dict[str, list[MasterMaterialProjectUsage]] = {}
+    for row in r.data or []:
+        by_master.setdefault(str(row["master_material_id"]), []).append(MasterMaterialProjectUsage(**row))
+    if master_material_ids is None:
+        wanted = get_catalog(supabase, tenant_id).items
+    else:
+        wanted = [m for i in master_material_ids if (m := get_master_material(supabase, i, tenant_id))]
+    return [
+        MasterMaterialUsageResponse(
+            master_material_id=item.id,
+            name=item.name,
+            unit=item.unit,
+            total_on_hand=sum(u.balance for u in by_master.get(item.id, [])),
+            projects=by_master.get(item.id, []),
+        )
+        for item in wanted
+    ]
+
+
+def list_unit_conversions(supabase: Client, master_material_id: str) -> list[UnitConversionResponse]:
+    """Conversions that apply to this master material: its own plus the global defaults."""
+    r = (
         supabase.schema(DB_SCHEMA)
-        .table("materials")
-        .select("id")
-        .eq("master_material_id", master_material_id)
-        .in_("project_id", project_ids)
-        .limit(1)
+        .table("unit_conversions")
+        .select("master_material_id, from_unit, to_unit, factor")
+        .or_(f"master_material_id.eq.{master_material_id},master_material_id.is.null")
+        .order("from_unit")
         .execute()
     )
-    return bool(used.data)
+    return [UnitConversionResponse(**row) for row in (r.data or [])]
+
+
+def set_unit_conversion(supabase: Client, master_material_id: str, payload: UnitConversionSet) -> None:
+    """Store a conversion for this master material together with its inverse."""
+    if payload.from_unit not in MATERIAL_UNITS or payload.to_unit not in MATERIAL_UNITS:
+        raise ValueError(f"units must be one of: {list(MATERIAL_UNITS)}")
+    if payload.from_unit == payload.to_unit:
+        raise ValueError("from_unit and to_unit must differ")
+    if not payload.factor > 0:
+        raise ValueError("factor must be positive")
+    params = {
+        "p_master_material_id": master_material_id,
+        "p_from_unit": payload.from_unit,
+        "p_to_unit": payload.to_unit,
+        "p_factor": payload.factor,
+    }
+    supabase.schema(DB_SCHEMA).rpc("set_unit_conversion", params).execute()
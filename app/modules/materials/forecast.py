@@ -0,0 +1,157 @@
+"""Days-of-stock-remaining forecasts from ledger consumption, computed for all materials in one batch."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from supabase import Client
+
+from app.core.cache import MISSING, TTLCache
+from app.core.constants import DB_SCHEMA
+from app.modules.materials.schemas import MaterialForecastResponse
+from app.modules.materials.service import list_materials_with_balance_by_project
+
+HISTORY_DAYS = 84  # whole weeks, so every weekday is sampled equally
+HORIZON_DAYS = 365
+SHORT_WINDOW = 7
+LONG_WINDOW = 28
+
+# Consumption profiles (rates, weekday factors) only use history up to yesterday, so they stay valid
+# for the rest of the UTC day; balances are never cached here.
+_cache = TTLCache(ttl_sec=86_400, max_entries=1_000)
+
+
+def usage_matrix(rows: list[dict], material_ids: list[str], start: date, days: int) -> np.ndarray:
+    """(materials x days) array of "out" quantities from (material_id, day, quantity) rows; day 0 is start."""
+    usage = np.zeros((len(material_ids), days))
+    if not rows:
+        return usage
+    index = {mid: i for i, mid in enumerate(material_ids)}
+    n = len(rows)
+    r = np.fromiter((index.get(str(row["material_id"]), -1) for row in rows), dtype=np.intp, count=n)
+    c = np.fromiter(((date.fromisoformat(str(row["day"])) - start).days for row in rows), dtype=np.intp, count=n)
+    q = np.fromiter((float(row["quantity"]) for row in rows), dtype=float, count=n)
+    keep = (r >= 0) & (c >= 0) & (c < days)
+    np.add.at(usage, (r[keep], c[keep]), q[keep])
+    return usage
+
+
+def consumption_profile(usage: np.ndarray, start: date) -> dict[str, np.ndarray]:
+    """Rolling rates and weekday factors for every row of usage at once (history only, no balances).
+
+    rate is the mean of the short and long rolling averages; weekday_factors[:, d] is the material's mean
+    consumption on weekday d (Monday = 0) relative to its overall daily mean.
+    """
+    rate_short = usage[:, -SHORT_WINDOW:].mean(axis=1)
+    rate_long = usage[:, -LONG_WINDOW:].mean(axis=1)
+    onehot = np.eye(7)[(start.weekday() + np.arange(usage.shape[1])) % 7]
+    weekday_mean = (usage @ onehot) / np.maximum(onehot.sum(axis=0), 1)
+    overall = usage.mean(axis=1, keepdims=True)
+    factors = np.divide(weekday_mean, overall, out=np.ones_like(weekday_mean), where=overall > 0)
+    return {
+        "rate_short": rate_short,
+        "rate_long": rate_long,
+        "rate": (rate_short + rate_long) / 2,
+        "weekday_factors": factors,
+    }
+
+
+def stockout_days(
+    rate: np.ndarray, factors: np.ndarray, balances: np.ndarray, first_weekday: int, horizon: int = HORIZON_DAYS
+) -> np.ndarray:
+    """Days until each balance is consumed, projecting rate x weekday factor from first_weekday onwards.
+
+    NaN when stock lasts beyond the horizon (or nothing is consumed); 0 when the balance is already used up.
+    """
+    m = len(rate)
+    daily = rate[:, None] * factors[:, (first_weekday + np.arange(horizon)) % 7]
+    cum = np.cumsum(daily, axis=1)
+    reached = cum >= balances[:, None]
+    k = reached.argmax(axis=1)
+    rows = np.arange(m)
+    before = np.where(k > 0, cum[rows, k - 1], 0.0)
+    step = daily[rows, k]
+    frac = np.divide(balances - before, step, out=np.zeros(m), where=step > 0)
+    days_remaining = np.where(reached.any(axis=1) & (rate > 0), k + np.clip(frac, 0, 1), np.nan)
+    return np.where(balances <= 0, 0.0, days_remaining)
+
+
+def project_days_remaining(
+    usage: np.ndarray, balances: np.ndarray, start: date, horizon: int = HORIZON_DAYS
+) -> dict[str, np.ndarray]:
+    """consumption_profile plus stockout_days, projecting from the day after the last history column."""
+    profile = consumption_profile(usage, start)
+    first_weekday = (start.weekday() + usage.shape[1]) % 7
+    profile["days_remaining"] = stockout_days(
+        profile["rate"], profile["weekday_factors"], balances, first_weekday, horizon
+    )
+    return profile
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _load_profile(supabase: Client, project_ids: list[str], material_ids: list[str], start: date) -> dict:
+    r = (
+        supabase.schema(DB_SCHEMA)
+        .rpc("material_daily_consumption", {"p_project_ids": project_ids, "p_since": start.isoformat()})
+        .execute()
+    )
+    usage = usage_matrix(list(r.data or []), material_ids, start, HISTORY_DAYS)
+    profile = consumption_profile(usage, start)
+    profile["index"] = {mid: i for i, mid in enumerate(material_ids)}
+    return profile
+
+
+def forecast_materials(supabase: Client, projects: list[tuple[str, str]]) -> list[MaterialForecastResponse]:
+    """Forecast every material of the given (project_id, project_name) pairs.
+
+    Consumption rates and weekday factors only use history up to yesterday and are cached per UTC day;
+    balances are read from material_stock on every call, so same-day ledger writes show up immediately.
+    """
+    if not projects:
+        return []
+    today = _utc_today()
+    names = dict(projects)
+    by_project = list_materials_with_balance_by_project(supabase, list(names))
+    materials = [mat for pid in names for mat in by_project.get(pid, [])]
+    if not materials:
+        return []
+
+    start = today - timedelta(days=HISTORY_DAYS)
+    key = (today.isoformat(), tuple(sorted(names)))
+    profile = _cache.get(key)
+    if profile is MISSING:
+        profile = _load_profile(supabase, list(names), [mat.id for mat in materials], start)
+        _cache.set(key, profile)
+
+    # Materials created since the profile was cached have no history yet: zero rate, flat week
+    rows = np.fromiter((profile["index"].get(mat.id, -1) for mat in materials), dtype=np.intp, count=len(materials))
+    known = rows >= 0
+    pick = np.where(known, rows, 0)
+    rate_short = np.where(known, profile["rate_short"][pick], 0.0)
+    rate_long = np.where(known, profile["rate_long"][pick], 0.0)
+    rate = (rate_short + rate_long) / 2
+    factors = np.where(known[:, None], profile["weekday_factors"][pick], 1.0)
+    balances = np.fromiter((mat.balance for mat in materials), dtype=float, count=len(materials))
+    days_remaining = stockout_days(rate, factors, balances, (today.weekday() + 1) % 7)
+
+    out = []
+    for i, mat in enumerate(materials):
+        left = days_remaining[i]
+        out.append(
+            MaterialForecastResponse(
+                material_id=mat.id,
+                project_id=mat.project_id,
+                project_name=names.get(mat.project_id, ""),
+                name=mat.name,
+                unit=mat.unit,
+                balance=mat.balance,
+                avg_daily_7d=round(float(rate_short[i]), 4),
+                avg_daily_28d=round(float(rate_long[i]), 4),
+                weekday_factors=[round(float(f), 3) for f in factors[i]],
+                days_remaining=None if np.isnan(left) else round(float(left), 1),
+                stockout_date=None if np.isnan(left) else today + timedelta(days=int(np.ceil(left))),
+            )
+        )
+    return out
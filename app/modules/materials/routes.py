@@ -1,29 +1,49 @@
+from datetime import date
+
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
-from app.core.constants import DB_SCHEMA
+from app.core.config import get_settings
 from app.core.dependencies import (
-    _first_row,
     get_current_user,
     get_project_access,
     get_supabase_client,
     get_tenant_id,
+    list_projects_with_access,
 )
+from app.core.fanout import chunked
+from app.core.pagination import MAX_PAGE_SIZE
 from app.core.permissions import CAN_MANAGE_MATERIALS, CAN_VIEW_MATERIALS
 from app.modules.materials.schemas import (
+    LedgerBatchRequest,
+    LedgerBatchResponse,
+    LedgerEntryFinalize,
     LedgerEntryResponse,
+    LedgerPage,
+    LowStockMaterialResponse,
     MaterialCreate,
+    MaterialForecastResponse,
     MaterialResponse,
     MaterialUpdate,
     MaterialWithBalanceResponse,
     ProjectMaterialsSummary,
+    StockRollupItem,
 )
+from app.modules.materials.forecast import forecast_materials
 from app.modules.materials.service import (
+    add_ledger_entries,
     add_ledger_entry,
     create_material,
     delete_material,
+    finalize_ledger_entry,
     get_material,
+    get_project_ref,
     list_ledger,
+    list_ledger_entries,
+    list_low_stock_materials,
     list_materials_with_balance,
+    list_materials_with_balance_by_project,
+    rollup_stock,
     update_material,
     upload_ledger_receipt,
 )
@@ -32,33 +52,6 @@ from supabase import Client
 router = APIRouter()
 
 
-def _project_ids_user_can_view(
-    supabase: Client, tenant_id: str, user_id: str, requested_ids: list[str],
-) -> list[tuple[str, str]]:
-    """Return (project_id, project_name) for each requested project user can view."""
-    from app.core.permissions import has_permission
-
-    tenant_role_r = (
-        supabase.schema(DB_SCHEMA).table("tenant_members").select("role").eq("tenant_id", tenant_id).eq("user_id", user_id).maybe_single().execute()
-    )
-    tenant_role = _first_row(tenant_role_r)
-    role = (tenant_role.get("role") if tenant_role else None) or "member"
-    if not has_permission(role, CAN_VIEW_MATERIALS):
-        return []
-    if role == "org_admin":
-        r = supabase.schema(DB_SCHEMA).table("projects").select("id, name").eq("tenant_id", tenant_id).in_("id", requested_ids or []).execute()
-        return [(row["id"], row["name"]) for row in (r.data or [])]
-    r = (
-        supabase.schema(DB_SCHEMA).table("project_members").select("project_id").eq("user_id", user_id).execute()
-    )
-    allowed_ids = {row["project_id"] for row in (r.data or [])}
-    allowed_ids &= set(requested_ids)
-    if not allowed_ids:
-        return []
-    projs = supabase.schema(DB_SCHEMA).table("projects").select("id, name").in_("id", list(allowed_ids)).execute()
-    return [(row["id"], row["name"]) for row in (projs.data or [])]
-
-
 @router.get("/summary", response_model=list[ProjectMaterialsSummary])
 def materials_summary_route(
     project_ids: str = Query(..., description="Comma-separated project IDs"),
@@ -66,15 +59,70 @@ def materials_summary_route(
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client),
 ):
-    ids = [x.strip() for x in project_ids.split(",") if x.strip()]
+    """Materials with balances for many projects, streamed as a JSON array.
+
+    One access query, then one balances query per PROJECT_QUERY_BATCH_SIZE projects, each chunk
+    written out before the next is loaded, so only one chunk of balances is held at a time.
+    """
+    ids = list(dict.fromkeys(x.strip() for x in project_ids.split(",") if x.strip()))
     if not ids:
         return []
-    projects = _project_ids_user_can_view(supabase, tenant_id, current_user["id"], ids)
-    out = []
-    for pid, pname in projects:
-        materials = list_materials_with_balance(supabase, pid)
-        out.append(ProjectMaterialsSummary(project_id=pid, project_name=pname, materials=materials))
-    return out
+    projects = list_projects_with_access(supabase, tenant_id, current_user["id"], CAN_VIEW_MATERIALS, ids)
+
+    def _stream():
+        yield "["
+        first = True
+        for batch in chunked(projects, get_settings().PROJECT_QUERY_BATCH_SIZE):
+            balances = list_materials_with_balance_by_project(supabase, [pid for pid, _ in batch])
+            for pid, pname in batch:
+                item = ProjectMaterialsSummary(project_id=pid, project_name=pname, materials=balances.get(pid, []))
+                yield ("" if first else ",") + item.model_dump_json()
+                first = False
+        yield "]"
+
+    return StreamingResponse(_stream(), media_type="application/json")
+
+
+@router.get("/low-stock", response_model=list[LowStockMaterialResponse])
+def low_stock_route(
+    tenant_id: str = Depends(get_tenant_id),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Materials at or below their reorder threshold in every project of the tenant the user can view."""
+    projects = list_projects_with_access(supabase, tenant_id, current_user["id"], CAN_VIEW_MATERIALS)
+    return list_low_stock_materials(supabase, projects)
+
+
+@router.get("/rollup", response_model=list[StockRollupItem])
+def stock_rollup_route(
+    tenant_id: str = Depends(get_tenant_id),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Stock on hand per master material across the projects the user can view, in the master's unit."""
+    projects = list_projects_with_access(supabase, tenant_id, current_user["id"], CAN_VIEW_MATERIALS)
+    return rollup_stock(supabase, [pid for pid, _ in projects])
+
+
+@router.get("/forecast", response_model=list[MaterialForecastResponse])
+def tenant_forecast_route(
+    tenant_id: str = Depends(get_tenant_id),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Days of stock remaining for every material in the tenant's projects the user can view."""
+    projects = list_projects_with_access(supabase, tenant_id, current_user["id"], CAN_VIEW_MATERIALS)
+    return forecast_materials(supabase, projects)
+
+
+@router.get("/{project_id}/materials/forecast", response_model=list[MaterialForecastResponse])
+def project_forecast_route(
+    project_id: str,
+    access: dict = Depends(get_project_access(CAN_VIEW_MATERIALS)),
+    supabase: Client = Depends(get_supabase_client),
+):
+    return forecast_materials(supabase, [get_project_ref(supabase, project_id)])
 
 
 @router.get("/{project_id}/materials", response_model=list[MaterialWithBalanceResponse])
@@ -125,16 +173,60 @@ def delete_material_route(
     delete_material(supabase, material_id, project_id)
 
 
+@router.post("/{project_id}/materials/ledger/batch", response_model=LedgerBatchResponse)
+def add_ledger_batch_route(
+    project_id: str,
+    body: LedgerBatchRequest,
+    access: dict = Depends(get_project_access(CAN_MANAGE_MATERIALS)),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Record many stock movements across the project's materials in one request; results are per item."""
+    try:
+        return add_ledger_entries(supabase, project_id, body.entries, current_user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{project_id}/materials/{material_id}/ledger", response_model=list[LedgerEntryResponse])
 def list_ledger_route(
     project_id: str,
     material_id: str,
+    date_from: date | None = Query(None, alias="from", description="Earliest day (inclusive), YYYY-MM-DD"),
+    date_to: date | None = Query(None, alias="to", description="Latest day (inclusive), YYYY-MM-DD"),
     access: dict = Depends(get_project_access(CAN_VIEW_MATERIALS)),
     supabase: Client = Depends(get_supabase_client),
 ):
-    if not get_material(supabase, material_id, project_id):
+    """Every ledger entry (optionally within from/to), newest first. Long histories: use /ledger/page."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    entries = list_ledger_entries(supabase, project_id, material_id, date_from, date_to)
+    if entries is None:
         raise HTTPException(status_code=404, detail="Material not found")
-    return list_ledger(supabase, material_id)
+    return entries
+
+
+@router.get("/{project_id}/materials/{material_id}/ledger/page", response_model=LedgerPage)
+def list_ledger_page_route(
+    project_id: str,
+    material_id: str,
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    date_from: date | None = Query(None, alias="from", description="Earliest day (inclusive), YYYY-MM-DD"),
+    date_to: date | None = Query(None, alias="to", description="Latest day (inclusive), YYYY-MM-DD"),
+    access: dict = Depends(get_project_access(CAN_VIEW_MATERIALS)),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """One page of the ledger, newest first; pass next_cursor back as cursor for older entries."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    try:
+        page = list_ledger(supabase, project_id, material_id, limit, cursor, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Material not found")
+    return page
 
 
 @router.post("/{project_id}/materials/{material_id}/ledger", response_model=LedgerEntryResponse, status_code=201)
@@ -159,3 +251,30 @@ def add_ledger_entry_route(
     return add_ledger_entry(
         supabase, material_id, type_, quantity, notes, current_user["id"], receipt_path=receipt_path
     )
+
+
+@router.post("/{project_id}/materials/{material_id}/ledger/finalize", response_model=LedgerEntryResponse, status_code=201)
+def finalize_ledger_entry_route(
+    project_id: str,
+    material_id: str,
+    payload: LedgerEntryFinalize,
+    access: dict = Depends(get_project_access(CAN_MANAGE_MATERIALS)),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Record a stock receipt whose document was uploaded directly to storage (purpose ledger_receipt).
+
+    Safe to retry: finalizing the same receipt_path again returns the entry already recorded.
+    """
+    if payload.type != "in":
+        raise HTTPException(status_code=400, detail="Receipts can only be attached to 'in' entries")
+    if not get_material(supabase, material_id, project_id):
+        raise HTTPException(status_code=404, detail="Material not found")
+    try:
+        return finalize_ledger_entry(
+            supabase, project_id, material_id, payload.quantity, payload.receipt_path, payload.notes, current_user["id"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
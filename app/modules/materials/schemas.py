@@ -1,3 +1,4 @@
+from datetime import date
 from decimal import Decimal
 from pydantic import BaseModel
 
@@ -6,11 +7,13 @@ class MaterialCreate(BaseModel):
     master_material_id: str | None = None  # use catalog entry; name/unit copied
     name: str | None = None  # required if master_material_id not set
     unit: str | None = None  # required if master_material_id not set
+    reorder_threshold: float | None = None  # low stock at or below this; defaults to the master material's
 
 
 class MaterialUpdate(BaseModel):
     name: str | None = None
     unit: str | None = None
+    reorder_threshold: float | None = None  # null falls back to the master material's threshold
 
 
 class MaterialResponse(BaseModel):
@@ -19,6 +22,7 @@ class MaterialResponse(BaseModel):
     name: str
     unit: str
     master_material_id: str | None = None
+    reorder_threshold: float | None = None
     created_at: str | None = None
 
 
@@ -39,6 +43,38 @@ class LedgerEntryResponse(BaseModel):
     created_by: str | None = None
 
 
+class LedgerEntryFinalize(LedgerEntryCreate):
+    receipt_path: str  # path returned by /storage/upload-url, after the client uploaded to it
+
+
+class LedgerBatchItem(LedgerEntryCreate):
+    material_id: str
+    client_ref: str | None = None  # caller's own id for the movement, echoed back in the result
+
+
+class LedgerBatchRequest(BaseModel):
+    entries: list[LedgerBatchItem]
+
+
+class LedgerBatchItemResult(BaseModel):
+    index: int  # position in the request
+    client_ref: str | None = None
+    ok: bool
+    entry: LedgerEntryResponse | None = None
+    error: str | None = None
+
+
+class LedgerBatchResponse(BaseModel):
+    created: int
+    rejected: int
+    results: list[LedgerBatchItemResult]
+
+
+class LedgerPage(BaseModel):
+    entries: list[LedgerEntryResponse]
+    next_cursor: str | None = None  # pass as ?cursor= for the next (older) page
+
+
 class MaterialWithBalanceResponse(BaseModel):
     id: str
     project_id: str
@@ -53,3 +89,38 @@ class ProjectMaterialsSummary(BaseModel):
     project_id: str
     project_name: str
     materials: list[MaterialWithBalanceResponse]
+
+
+class LowStockMaterialResponse(BaseModel):
+    id: str
+    project_id: str
+    project_name: str
+    name: str
+    unit: str
+    balance: float
+    reorder_threshold: float
+    master_material_id: str | None = None
+
+
+class MaterialForecastResponse(BaseModel):
+    material_id: str
+    project_id: str
+    project_name: str
+    name: str
+    unit: str
+    balance: float
+    avg_daily_7d: float  # mean daily "out" quantity over the last 7 days
+    avg_daily_28d: float
+    weekday_factors: list[float]  # Monday..Sunday consumption relative to the daily mean
+    days_remaining: float | None = None  # None: stock outlasts the forecast horizon
+    stockout_date: date | None = None
+
+
+class StockRollupItem(BaseModel):
+    master_material_id: str
+    name: str
+    unit: str  # master material's unit; totals are converted into it
+    total_quantity: float
+    project_count: int
+    material_count: int
+    unconverted_count: int = 0  # materials in a unit with no configured conversion (not in the total)
@@ -1,15 +1,24 @@
 import uuid
-from decimal import Decimal
+from datetime import date, timedelta
 from fastapi import UploadFile
+from postgrest.exceptions import APIError
 from supabase import Client
 
 from app.core.constants import DB_SCHEMA, MATERIAL_UNITS
+from app.core.pagination import keyset_before, split_page
+from app.core.storage import confirm_upload, upload_object
 from app.modules.materials.schemas import (
+    LedgerBatchItem,
+    LedgerBatchItemResult,
+    LedgerBatchResponse,
     LedgerEntryResponse,
+    LedgerPage,
+    LowStockMaterialResponse,
     MaterialCreate,
     MaterialResponse,
     MaterialWithBalanceResponse,
     MaterialUpdate,
+    StockRollupItem,
 )
 
 
@@ -24,23 +33,58 @@ def list_materials(supabase: Client, project_id: str) -> list[MaterialResponse]:
 
 
 def get_material_balance(supabase: Client, material_id: str) -> float:
-    r = supabase.schema(DB_SCHEMA).table("material_ledger").select("type, quantity").eq("material_id", material_id).execute()
-    total = Decimal("0")
+    """Stock on hand (material_stock is kept in sync by a trigger on material_ledger)."""
+    r = supabase.schema(DB_SCHEMA).table("material_stock").select("balance").eq("material_id", material_id).limit(1).execute()
+    row = (r.data or [None])[0]
+    return float(row["balance"]) if row else 0.0
+
+
+def list_materials_with_balance_by_project(
+    supabase: Client, project_ids: list[str]
+) -> dict[str, list[MaterialWithBalanceResponse]]:
+    """Materials with balances for all project_ids in one grouped query, keyed by project_id (ordered by created_at)."""
+    out: dict[str, list[MaterialWithBalanceResponse]] = {pid: [] for pid in project_ids}
+    if not project_ids:
+        return out
+    r = supabase.schema(DB_SCHEMA).rpc("project_material_balances", {"p_project_ids": project_ids}).execute()
     for row in r.data or []:
-        if row["type"] == "in":
-            total += Decimal(str(row["quantity"]))
-        else:
-            total -= Decimal(str(row["quantity"]))
-    return float(total)
+        out.setdefault(str(row["project_id"]), []).append(MaterialWithBalanceResponse(**row))
+    return out
 
 
 def list_materials_with_balance(supabase: Client, project_id: str) -> list[MaterialWithBalanceResponse]:
-    materials = list_materials(supabase, project_id)
-    out = []
-    for m in materials:
-        balance = get_material_balance(supabase, m.id)
-        out.append(MaterialWithBalanceResponse(**(m.model_dump()), balance=balance))
-    return out
+    # Rows are keyed by the canonical id PostgREST returns, not the path value (which may be upper-case)
+    project_id = str(uuid.UUID(project_id))
+    return list_materials_with_balance_by_project(supabase, [project_id])[project_id]
+
+
+def get_project_ref(supabase: Client, project_id: str) -> tuple[str, str]:
+    """(canonical project id, project name) for a path project id, as list_projects_with_access returns them."""
+    r = supabase.schema(DB_SCHEMA).table("projects").select("id, name").eq("id", project_id).limit(1).execute()
+    row = (r.data or [None])[0]
+    if not row:
+        return str(uuid.UUID(project_id)), ""
+    return str(row["id"]), row.get("name") or ""
+
+
+def list_low_stock_materials(supabase: Client, projects: list[tuple[str, str]]) -> list[LowStockMaterialResponse]:
+    """Materials at or below their reorder threshold across (project_id, project_name) pairs, in one query."""
+    if not projects:
+        return []
+    names = dict(projects)
+    r = supabase.schema(DB_SCHEMA).rpc("low_stock_materials", {"p_project_ids": list(names)}).execute()
+    return [
+        LowStockMaterialResponse(**row, project_name=names.get(str(row["project_id"]), ""))
+        for row in (r.data or [])
+    ]
+
+
+def rollup_stock(supabase: Client, project_ids: list[str]) -> list[StockRollupItem]:
+    """Stock on hand per master material across projects, unit-converted and summed in the database."""
+    if not project_ids:
+        return []
+    r = supabase.schema(DB_SCHEMA).rpc("material_stock_rollup", {"p_project_ids": project_ids}).execute()
+    return [StockRollupItem(**row) for row in (r.data or [])]
 
 
 def create_material(
@@ -49,6 +93,7 @@ def create_material(
     if payload.master_material_id:
         from app.modules.master_materials.service import get_master_material
 
+        # Served from this worker's catalog when warm; the FK rejects an entry deleted since (see below)
         master = get_master_material(supabase, payload.master_material_id, tenant_id)
         if not master:
             raise ValueError("Master material not found")
@@ -59,8 +104,21 @@ def create_material(
         if payload.unit not in MATERIAL_UNITS:
             raise ValueError(f"unit must be one of: {list(MATERIAL_UNITS)}")
         name, unit, mid = payload.name, payload.unit, None
-    row = {"project_id": project_id, "name": name, "unit": unit, "master_material_id": mid}
-    r = supabase.schema(DB_SCHEMA).table("materials").insert(row).execute()
+    if payload.reorder_threshold is not None and payload.reorder_threshold < 0:
+        raise ValueError("reorder_threshold must not be negative")
+    row = {
+        "project_id": project_id,
+        "name": name,
+        "unit": unit,
+        "master_material_id": mid,
+        "reorder_threshold": payload.reorder_threshold,
+    }
+    try:
+        r = supabase.schema(DB_SCHEMA).table("materials").insert(row).execute()
+    except APIError as e:
+        if mid and e.code == "23503":  # foreign_key_violation: master deleted on another worker
+            raise ValueError("Master material not found")
+        raise
     row_out = (r.data or [None])[0]
     if not row_out:
         raise ValueError("Insert failed")
@@ -71,6 +129,8 @@ def update_material(supabase: Client, material_id: str, project_id: str, payload
     data = payload.model_dump(exclude_unset=True)
     if "unit" in data and data["unit"] not in MATERIAL_UNITS:
         raise ValueError(f"unit must be one of: {list(MATERIAL_UNITS)}")
+    if (data.get("reorder_threshold") or 0) < 0:
+        raise ValueError("reorder_threshold must not be negative")
     r = supabase.schema(DB_SCHEMA).table("materials").update(data).eq("id", material_id).eq("project_id", project_id).execute()
     row = (r.data or [None])[0]
     if not row:
@@ -85,16 +145,22 @@ def delete_material(supabase: Client, material_id: str, project_id: str) -> None
 RECEIPT_BUCKET = "material_receipts"
 
 
-def upload_ledger_receipt(supabase: Client, project_id: str, material_id: str, file: UploadFile) -> str:
-    ext = (file.filename or "").split(".")[-1] if file.filename else "bin"
+def ledger_receipt_path(project_id: str, material_id: str, filename: str | None) -> str:
+    ext = (filename or "").split(".")[-1] if filename else "bin"
     if ext.lower() not in ("pdf", "jpg", "jpeg", "png", "heic", "webp"):
         ext = "bin"
-    path = f"{project_id}/{material_id}/{uuid.uuid4().hex}.{ext}"
+    return f"{project_id}/{material_id}/{uuid.uuid4().hex}.{ext}"
+
+
+def confirm_ledger_receipt(supabase: Client, project_id: str, material_id: str, path: str) -> str:
+    """Verify a receipt the client uploaded through a signed upload URL. Raises ValueError."""
+    return confirm_upload(supabase, RECEIPT_BUCKET, path, f"{project_id}/{material_id}/")
+
+
+def upload_ledger_receipt(supabase: Client, project_id: str, material_id: str, file: UploadFile) -> str:
+    path = ledger_receipt_path(project_id, material_id, file.filename)
     content = file.file.read()
-    supabase.storage.from_(RECEIPT_BUCKET).upload(
-        path, content, file_options={"content-type": file.content_type or "application/octet-stream"}
-    )
-    return path
+    return upload_object(supabase, RECEIPT_BUCKET, path, content, file.content_type or "application/octet-stream")
 
 
 def add_ledger_entry(
@@ -122,6 +188,180 @@ def add_ledger_entry(
     return LedgerEntryResponse(**row_out)
 
 
-def list_ledger(supabase: Client, material_id: str) -> list[LedgerEntryResponse]:
-    r = supabase.schema(DB_SCHEMA).table("material_ledger").select("*").eq("material_id", material_id).order("created_at", desc=True).execute()
-    return [LedgerEntryResponse(**row) for row in (r.data or [])]
+def get_ledger_entry_by_receipt(supabase: Client, material_id: str, receipt_path: str) -> LedgerEntryResponse | None:
+    r = (
+        supabase.schema(DB_SCHEMA)
+        .table("material_ledger")
+        .select("*")
+        .eq("material_id", material_id)
+        .eq("receipt_path", receipt_path)
+        .limit(1)
+        .execute()
+    )
+    row = (r.data or [None])[0]
+    return LedgerEntryResponse(**row) if row else None
+
+
+def finalize_ledger_entry(
+    supabase: Client,
+    project_id: str,
+    material_id: str,
+    quantity: float,
+    receipt_path: str,
+    notes: str | None,
+    created_by: str,
+) -> LedgerEntryResponse:
+    """Record an "in" entry for a directly uploaded receipt. Raises ValueError.
+
+    The receipt path is the idempotency key (unique in material_ledger): a retried finalize
+    returns the entry recorded by the first call instead of adding the stock twice.
+    """
+    receipt_path = receipt_path.lstrip("/")
+    existing = get_ledger_entry_by_receipt(supabase, material_id, receipt_path)
+    if existing:
+        return existing
+    path = confirm_ledger_receipt(supabase, project_id, material_id, receipt_path)
+    try:
+        return add_ledger_entry(supabase, material_id, "in", quantity, notes, created_by, receipt_path=path)
+    except APIError as e:
+        # A concurrent retry inserted first
+        existing = get_ledger_entry_by_receipt(supabase, material_id, path) if e.code == "23505" else None
+        if not existing:
+            raise
+        return existing
+
+
+MAX_LEDGER_BATCH = 500
+
+
+def _batch_item_error(item: LedgerBatchItem) -> str | None:
+    if item.type not in ("in", "out"):
+        return "type must be 'in' or 'out'"
+    if not item.quantity > 0:
+        return "quantity must be positive"
+    return None
+
+
+def _canonical_uuid(value: str) -> str | None:
+    """Lower-case hyphenated form (as PostgREST returns ids), or None if value is not a UUID."""
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return None
+
+
+def add_ledger_entries(
+    supabase: Client, project_id: str, items: list[LedgerBatchItem], created_by: str
+) -> LedgerBatchResponse:
+    """Validate a batch of movements set-wise and insert the valid ones in a single statement.
+
+    Invalid items are reported per index and do not block the rest. Raises ValueError if the batch is too large.
+    """
+    if len(items) > MAX_LEDGER_BATCH:
+        raise ValueError(f"At most {MAX_LEDGER_BATCH} entries per batch")
+    errors = {i: err for i, item in enumerate(items) if (err := _batch_item_error(item))}
+    # Compare canonical ids on both sides, so upper-case or unhyphenated client ids still match
+    material_ids: dict[int, str] = {}
+    for i, item in enumerate(items):
+        if i in errors:
+            continue
+        if (mid := _canonical_uuid(item.material_id)) is None:
+            errors[i] = "Invalid material_id"
+        else:
+            material_ids[i] = mid
+    known: set[str] = set()
+    if material_ids:
+        r = (
+            supabase.schema(DB_SCHEMA)
+            .table("materials")
+            .select("id")
+            .eq("project_id", project_id)
+            .in_("id", sorted(set(material_ids.values())))
+            .execute()
+        )
+        known = {_canonical_uuid(str(row["id"])) for row in (r.data or [])}
+    for i, mid in material_ids.items():
+        if mid not in known:
+            errors[i] = "Material not found"
+
+    valid = [i for i in range(len(items)) if i not in errors]
+    inserted: list[dict] = []
+    if valid:
+        rows = [
+            {
+                "material_id": material_ids[i],
+                "type": items[i].type,
+                "quantity": items[i].quantity,
+                "notes": items[i].notes,
+                "created_by": created_by,
+            }
+            for i in valid
+        ]
+        r = supabase.schema(DB_SCHEMA).table("material_ledger").insert(rows).execute()
+        inserted = list(r.data or [])
+        if len(inserted) != len(valid):
+            raise ValueError("Insert failed")
+
+    created = {i: LedgerEntryResponse(**row) for i, row in zip(valid, inserted)}
+    results = [
+        LedgerBatchItemResult(
+            index=i,
+            client_ref=item.client_ref,
+            ok=i in created,
+            entry=created.get(i),
+            error=errors.get(i),
+        )
+        for i, item in enumerate(items)
+    ]
+    return LedgerBatchResponse(created=len(created), rejected=len(errors), results=results)
+
+
+def _ledger_query(supabase: Client, project_id: str, material_id: str, date_from: date | None, date_to: date | None):
+    """The material with its ledger embedded (newest first), so a missing material costs no extra query."""
+    query = (
+        supabase.schema(DB_SCHEMA)
+        .table("materials")
+        .select("id, material_ledger(*)")
+        .eq("id", material_id)
+        .eq("project_id", project_id)
+    )
+    if date_from:
+        query = query.gte("material_ledger.created_at", date_from.isoformat())
+    if date_to:
+        query = query.lt("material_ledger.created_at", (date_to + timedelta(days=1)).isoformat())
+    return query.order("created_at", desc=True, foreign_table="material_ledger").order(
+        "id", desc=True, foreign_table="material_ledger"
+    )
+
+
+def list_ledger(
+    supabase: Client,
+    project_id: str,
+    material_id: str,
+    limit: int = 50,
+    cursor: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> LedgerPage | None:
+    """One page of a material's ledger, newest first, optionally within [date_from, date_to].
+
+    Returns None if the material does not exist. Raises ValueError on a bad cursor.
+    """
+    query = _ledger_query(supabase, project_id, material_id, date_from, date_to)
+    if cursor:
+        query = query.or_(keyset_before(cursor), reference_table="material_ledger")
+    r = query.limit(limit + 1, foreign_table="material_ledger").execute()
+    if not r.data:
+        return None
+    rows, next_cursor = split_page(list(r.data[0].get("material_ledger") or []), limit)
+    return LedgerPage(entries=[LedgerEntryResponse(**row) for row in rows], next_cursor=next_cursor)
+
+
+def list_ledger_entries(
+    supabase: Client, project_id: str, material_id: str, date_from: date | None = None, date_to: date | None = None
+) -> list[LedgerEntryResponse] | None:
+    """All of a material's ledger entries within [date_from, date_to], newest first (unpaged). None if no material."""
+    r = _ledger_query(supabase, project_id, material_id, date_from, date_to).execute()
+    if not r.data:
+        return None
+    return [LedgerEntryResponse(**row) for row in (r.data[0].get("material_ledger") or [])]
@@ -1,5 +1,6 @@
 from supabase import Client
 
+from app.core.access import invalidate_project, invalidate_project_member
 from app.core.constants import DB_SCHEMA
 from app.modules.projects.schemas import (
     ProjectCreate,
@@ -10,21 +11,18 @@ from app.modules.projects.schemas import (
 )
 
 
-def list_projects(supabase: Client, tenant_id: str, user_id: str) -> list[ProjectResponse]:
-    """Return projects the user is assigned to (member of), within the tenant."""
-    members_r = supabase.schema(DB_SCHEMA).table("project_members").select("project_id").eq("user_id", user_id).execute()
-    project_ids = [row["project_id"] for row in (members_r.data or [])]
-    if not project_ids:
-        return []
-    r = (
-        supabase.schema(DB_SCHEMA)
-        .table("projects")
-        .select("*")
-        .eq("tenant_id", tenant_id)
-        .in_("id", project_ids)
-        .order("created_at", desc=True)
-        .execute()
-    )
+def list_projects(
+    supabase: Client, tenant_id: str, user_id: str, tenant_role: str | None = None
+) -> list[ProjectResponse]:
+    """Return projects the user is assigned to (member of), within the tenant. Org admins get all tenant projects."""
+    query = supabase.schema(DB_SCHEMA).table("projects").select("*").eq("tenant_id", tenant_id)
+    if tenant_role != "org_admin":
+        members_r = supabase.schema(DB_SCHEMA).table("project_members").select("project_id").eq("user_id", user_id).execute()
+        project_ids = [row["project_id"] for row in (members_r.data or [])]
+        if not project_ids:
+            return []
+        query = query.in_("id", project_ids)
+    r = query.order("created_at", desc=True).execute()
     return [ProjectResponse(**row) for row in (r.data or [])]
 
 
@@ -72,6 +70,7 @@ def update_project(
 
 def delete_project(supabase: Client, project_id: str, tenant_id: str) -> None:
     supabase.schema(DB_SCHEMA).table("projects").delete().eq("id", project_id).eq("tenant_id", tenant_id).execute()
+    invalidate_project(project_id)
 
 
 def list_project_members(supabase: Client, project_id: str) -> list[ProjectMemberResponse]:
@@ -85,11 +84,13 @@ def add_project_member(supabase: Client, project_id: str, payload: ProjectMember
     data = (r.data or [None])[0]
     if not data:
         raise ValueError("Insert did not return row")
+    invalidate_project_member(project_id, payload.user_id)
     return ProjectMemberResponse(**data)
 
 
 def update_project_member(supabase: Client, project_id: str, user_id: str, role: str) -> ProjectMemberResponse:
     r = supabase.schema(DB_SCHEMA).table("project_members").update({"role": role}).eq("project_id", project_id).eq("user_id", user_id).execute()
+    invalidate_project_member(project_id, user_id)
     row = (r.data or [None])[0]
     if not row:
         raise ValueError("Project member not found")
@@ -98,3 +99,4 @@ def update_project_member(supabase: Client, project_id: str, user_id: str, role:
 
 def remove_project_member(supabase: Client, project_id: str, user_id: str) -> None:
     supabase.schema(DB_SCHEMA).table("project_members").delete().eq("project_id", project_id).eq("user_id", user_id).execute()
+    invalidate_project_member(project_id, user_id)
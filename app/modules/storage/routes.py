@@ -1,16 +1,37 @@
 import logging
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.core.dependencies import get_current_user, get_supabase_client
+from app.core.dependencies import ensure_project_access, get_current_user, get_supabase_client, get_tenant_id
+from app.core.media import find_variant
+from app.core.permissions import (
+    CAN_LOG_ATTENDANCE,
+    CAN_MANAGE_DAILY_REPORTS,
+    CAN_MANAGE_EXPENSE,
+    CAN_MANAGE_MATERIALS,
+)
+from app.core.storage import STORAGE_BUCKETS, create_upload_url
+from app.modules.attendance.service import SELFIE_BUCKET, selfie_object_path
+from app.modules.daily_reports.service import DAILY_REPORTS_BUCKET, photo_object_path
+from app.modules.expense.service import RECEIPT_BUCKET as EXPENSE_BUCKET, receipt_object_path
+from app.modules.materials.service import RECEIPT_BUCKET as MATERIAL_RECEIPT_BUCKET, get_material, ledger_receipt_path
+from app.modules.storage.schemas import UploadUrlRequest, UploadUrlResponse
 from supabase import Client
 
 router = APIRouter()
 log = logging.getLogger(__name__)
 
-ALLOWED_BUCKETS = frozenset({"daily_reports", "expense", "attendance", "material_receipts"})
+ALLOWED_BUCKETS = frozenset(STORAGE_BUCKETS)
 SIGNED_URL_EXPIRY_SEC = 3600
 
+UPLOAD_PERMISSIONS = {
+    "daily_report_photo": CAN_MANAGE_DAILY_REPORTS,
+    "attendance_selfie": CAN_LOG_ATTENDANCE,
+    "expense_receipt": CAN_MANAGE_EXPENSE,
+    "ledger_receipt": CAN_MANAGE_MATERIALS,
+}
+
 
 def _extract_signed_url(res) -> str | None:
     if isinstance(res, dict):
@@ -27,6 +48,7 @@ def _create_signed_url(supabase: Client, bucket: str, path: str):
 def get_signed_url(
     bucket: str = Query(..., description="Storage bucket name"),
     path: str = Query(..., description="Object path within the bucket"),
+    variant: Literal["thumb", "web"] | None = Query(None, description="Resized image variant; falls back to the original"),
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client),
 ):
@@ -37,10 +59,14 @@ def get_signed_url(
     if not path or ".." in path:
         raise HTTPException(status_code=400, detail="Invalid path")
 
-    # Try path as given, then try without leading "bucket/" (handles old vs new stored paths)
-    for try_path in (path, path.split("/", 1)[-1] if path.startswith(f"{bucket}/") else None):
-        if try_path is None:
-            continue
+    # Try path as given, then try without leading "bucket/" (handles old vs new stored paths).
+    paths = [path] + ([path.split("/", 1)[1]] if path.startswith(f"{bucket}/") else [])
+    # A requested variant is only signed once media_variants records it; until then the original is served
+    if variant:
+        rendered = find_variant(supabase, bucket, paths, variant)
+        if rendered:
+            paths.insert(0, rendered)
+    for try_path in paths:
         try:
             url = _create_signed_url(supabase, bucket, try_path)
             if url:
@@ -50,3 +76,42 @@ def get_signed_url(
             continue
 
     raise HTTPException(status_code=404, detail="Object not found")
+
+
+def _upload_target(supabase: Client, payload: UploadUrlRequest, user_id: str) -> tuple[str, str]:
+    """(bucket, object path) for an upload purpose, laid out like the multipart upload endpoints."""
+    pid = payload.project_id
+    if payload.purpose == "daily_report_photo":
+        if not payload.report_date:
+            raise ValueError("report_date is required")
+        return DAILY_REPORTS_BUCKET, photo_object_path(pid, user_id, payload.report_date)
+    if payload.purpose == "attendance_selfie":
+        if not payload.date or payload.kind not in ("in", "out"):
+            raise ValueError("date and kind ('in' or 'out') are required")
+        return SELFIE_BUCKET, selfie_object_path(pid, user_id, payload.date, payload.kind)
+    if payload.purpose == "expense_receipt":
+        return EXPENSE_BUCKET, receipt_object_path(pid, payload.filename)
+    if not payload.material_id or not get_material(supabase, payload.material_id, pid):
+        raise ValueError("Material not found")
+    return MATERIAL_RECEIPT_BUCKET, ledger_receipt_path(pid, payload.material_id, payload.filename)
+
+
+@router.post("/upload-url", response_model=UploadUrlResponse)
+def create_upload_url_route(
+    payload: UploadUrlRequest,
+    tenant_id: str = Depends(get_tenant_id),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Signed URL for uploading a photo/selfie/receipt straight to storage; then call the purpose's finalize endpoint."""
+    user_id = current_user["id"]
+    ensure_project_access(supabase, tenant_id, user_id, payload.project_id, UPLOAD_PERMISSIONS[payload.purpose])
+    try:
+        bucket, path = _upload_target(supabase, payload, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return create_upload_url(supabase, bucket, path)
+    except Exception as e:
+        log.warning("create_signed_upload_url %s/%s: %s", bucket, path, e)
+        raise HTTPException(status_code=502, detail="Could not create upload URL")
@@ -0,0 +1,22 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+UploadPurpose = Literal["daily_report_photo", "attendance_selfie", "expense_receipt", "ledger_receipt"]
+
+
+class UploadUrlRequest(BaseModel):
+    purpose: UploadPurpose
+    project_id: str
+    report_date: str | None = None  # daily_report_photo
+    date: str | None = None  # attendance_selfie
+    kind: str | None = None  # attendance_selfie: in | out
+    material_id: str | None = None  # ledger_receipt
+    filename: str | None = None  # expense_receipt, ledger_receipt (extension is kept)
+
+
+class UploadUrlResponse(BaseModel):
+    bucket: str
+    path: str  # pass back to the matching finalize endpoint once the upload succeeded
+    signed_url: str  # PUT the file here (or use storage uploadToSignedUrl with path + token)
+    token: str
@@ -4,6 +4,7 @@ from app.core.dependencies import get_current_user, get_project_access, get_supa
 from app.core.permissions import CAN_MANAGE_TASK_STATUSES, CAN_MANAGE_TASKS, CAN_VIEW_PROJECT
 from app.modules.tasks.schemas import (
     TaskCreate,
+    TaskDueCountResponse,
     TaskResponse,
     TaskStatusCreate,
     TaskStatusResponse,
@@ -14,6 +15,7 @@ from app.modules.tasks.schemas import (
 )
 from app.modules.tasks.service import (
     add_task_update,
+    count_due_tasks,
     create_status,
     create_task,
     delete_status,
@@ -83,6 +85,18 @@ def list_tasks_route(
     return tasks
 
 
+@router.get("/{project_id}/tasks/due-count", response_model=TaskDueCountResponse)
+def due_count_route(
+    project_id: str,
+    access: dict = Depends(get_project_access(CAN_VIEW_PROJECT)),
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """Count of due (not done) tasks; non-admins only count tasks assigned to them."""
+    assignee_id = None if access.get("role") == "admin" else current_user["id"]
+    return TaskDueCountResponse(due_tasks=count_due_tasks(supabase, project_id, assignee_id))
+
+
 @router.get("/{project_id}/tasks/{task_id}", response_model=TaskResponse)
 def get_task_route(
     project_id: str,
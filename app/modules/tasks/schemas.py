@@ -49,6 +49,10 @@ class TaskResponse(BaseModel):
     updated_at: str | None = None
 
 
+class TaskDueCountResponse(BaseModel):
+    due_tasks: int
+
+
 class TaskUpdateNoteCreate(BaseModel):
     note: str
 
@@ -1,6 +1,9 @@
+from datetime import datetime, timezone
+
 from supabase import Client
 
-from app.core.constants import DB_SCHEMA
+from app.core.constants import DB_SCHEMA, DONE_TASK_STATUS_NAMES
+from app.modules.dashboard.cache import invalidate_project_summaries
 from app.modules.tasks.schemas import (
     TaskCreate,
     TaskResponse,
@@ -66,6 +69,24 @@ def list_tasks(supabase: Client, project_id: str) -> list[TaskResponse]:
     ]
 
 
+def count_due_tasks(supabase: Client, project_id: str, assignee_id: str | None = None) -> int:
+    """Tasks due today or earlier (UTC) and not in a done status; counted in the database."""
+    r = (
+        supabase.schema(DB_SCHEMA)
+        .rpc(
+            "count_due_tasks",
+            {
+                "p_project_id": project_id,
+                "p_today": datetime.now(timezone.utc).date().isoformat(),
+                "p_done_status_names": list(DONE_TASK_STATUS_NAMES),
+                "p_assignee_id": assignee_id,
+            },
+        )
+        .execute()
+    )
+    return int(r.data or 0)
+
+
 def get_task(supabase: Client, task_id: str, project_id: str) -> TaskResponse | None:
     r = supabase.schema(DB_SCHEMA).table("tasks").select("*").eq("id", task_id).eq("project_id", project_id).maybe_single().execute()
     if not r or not r.data:
@@ -102,6 +123,7 @@ def create_task(supabase: Client, project_id: str, created_by: str, payload: Tas
     data = (r.data or [None])[0] if r else None
     if not data:
         raise ValueError("Insert did not return row")
+    invalidate_project_summaries(project_id)
     return _task_response_with_assignee_name(supabase, data)
 
 
@@ -111,11 +133,13 @@ def update_task(supabase: Client, task_id: str, project_id: str, payload: TaskUp
     row = (r.data or [None])[0]
     if not row:
         raise ValueError("Task not found")
+    invalidate_project_summaries(project_id)
     return _task_response_with_assignee_name(supabase, row)
 
 
 def delete_task(supabase: Client, task_id: str, project_id: str) -> None:
     supabase.schema(DB_SCHEMA).table("tasks").delete().eq("id", task_id).eq("project_id", project_id).execute()
+    invalidate_project_summaries(project_id)
 
 
 def list_task_updates(supabase: Client, project_id: str, task_id: str) -> list[TaskUpdateNoteResponse]:
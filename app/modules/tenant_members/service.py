@@ -1,5 +1,6 @@
 from supabase import Client
 
+from app.core.access import invalidate_tenant_member
 from app.core.constants import DB_SCHEMA
 from app.modules.tenant_members.schemas import TenantMemberCreate, TenantMemberResponse
 
@@ -46,11 +47,13 @@ def add_member(supabase: Client, tenant_id: str, payload: TenantMemberCreate) ->
     data = (r.data or [None])[0]
     if not data:
         raise ValueError("Insert did not return row")
+    invalidate_tenant_member(tenant_id, user_id)
     return TenantMemberResponse(**data)
 
 
 def update_member(supabase: Client, tenant_id: str, user_id: str, role: str) -> TenantMemberResponse:
     r = supabase.schema(DB_SCHEMA).table("tenant_members").update({"role": role}).eq("tenant_id", tenant_id).eq("user_id", user_id).execute()
+    invalidate_tenant_member(tenant_id, user_id)
     data = (r.data or [None])[0]
     if not data:
         raise ValueError("tenant_member_not_found")
@@ -59,3 +62,4 @@ def update_member(supabase: Client, tenant_id: str, user_id: str, role: str) ->
 
 def remove_member(supabase: Client, tenant_id: str, user_id: str) -> None:
     supabase.schema(DB_SCHEMA).table("tenant_members").delete().eq("tenant_id", tenant_id).eq("user_id", user_id).execute()
+    invalidate_tenant_member(tenant_id, user_id)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Verify (and optionally rebuild) maintained balances against their source logs.
+- wallets: fieldops.project_wallets vs expense_transactions
+- stock:   fieldops.material_stock vs material_ledger
+Run with: SUPABASE_URL=... SUPABASE_SERVICE_ROLE_KEY=... python scripts/reconcile_balances.py [--apply]
+Exits 1 if drift was found and not repaired.
+--apply locks the balances it rebuilds, so it is safe to run while the API is writing.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+log = logging.getLogger(__name__)
+
+# Load .env from backend root if present
+try:
+    from dotenv import load_dotenv
+    _root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    load_dotenv(os.path.join(_root, ".env"))
+except ImportError:
+    pass
+
+DB_SCHEMA = "fieldops"
+
+# target name -> (reconcile RPC, id column, label)
+TARGETS = {
+    "wallets": ("reconcile_project_wallets", "project_id", "project wallet"),
+    "stock": ("reconcile_material_stock", "material_id", "material stock"),
+}
+
+
+def get_env(name: str) -> str:
+    v = os.environ.get(name)
+    if v is None or not v.strip():
+        logging.error("Missing required env: %s", name)
+        sys.exit(1)
+    return v.strip()
+
+
+def create_supabase_client():
+    from supabase import create_client
+    return create_client(get_env("SUPABASE_URL"), get_env("SUPABASE_SERVICE_ROLE_KEY"))
+
+
+def reconcile(supabase, target: str, *, apply: bool) -> int:
+    """Log drifted rows for target and return how many there were."""
+    fn, id_col, label = TARGETS[target]
+    r = supabase.schema(DB_SCHEMA).rpc(fn, {"p_apply": apply}).execute()
+    rows = r.data or []
+    for row in rows:
+        log.info(
+            "%s %s: stored=%s computed=%s", label, row[id_col], row["stored_balance"], row["computed_balance"]
+        )
+    if rows:
+        log.info("%s: %d drifted%s", target, len(rows), " (rebuilt)" if apply else "")
+    else:
+        log.info("%s: in sync", target)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile FieldOps maintained balances")
+    parser.add_argument("--apply", action="store_true", help="Rebuild drifted balances from the source log")
+    parser.add_argument("--only", choices=sorted(TARGETS), action="append", help="Limit to target (repeatable)")
+    args = parser.parse_args()
+    supabase = create_supabase_client()
+    drift = sum(reconcile(supabase, t, apply=args.apply) for t in (args.only or sorted(TARGETS)))
+    sys.exit(1 if drift and not args.apply else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+-- Single-round-trip access check: project tenant + caller's tenant role + project role. Run after 011.
+CREATE OR REPLACE FUNCTION fieldops.resolve_project_access(p_project_id UUID, p_user_id UUID)
+RETURNS TABLE (project_tenant_id UUID, tenant_role TEXT, project_role TEXT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        p.tenant_id,
+        (SELECT tm.role FROM fieldops.tenant_members tm
+          WHERE tm.tenant_id = p.tenant_id AND tm.user_id = p_user_id),
+        (SELECT pm.role FROM fieldops.project_members pm
+          WHERE pm.project_id = p.id AND pm.user_id = p_user_id)
+    FROM fieldops.projects p
+    WHERE p.id = p_project_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.resolve_project_access(UUID, UUID) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,64 @@
+-- Set-based dashboard: wallet balance, task counts, due tasks and today's attendance per project. Run after 015.
+CREATE OR REPLACE FUNCTION fieldops.dashboard_project_stats(
+    p_project_ids UUID[],
+    p_user_id UUID,
+    p_only_assigned BOOLEAN,
+    p_today DATE,
+    p_done_status_names TEXT[]
+)
+RETURNS TABLE (
+    project_id UUID,
+    wallet_balance NUMERIC,
+    task_count BIGINT,
+    due_tasks BIGINT,
+    today_attendance_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH ids AS (
+        SELECT DISTINCT unnest(p_project_ids) AS project_id
+    ),
+    done AS (
+        SELECT array_agg(upper(trim(n))) AS names FROM unnest(p_done_status_names) AS n
+    ),
+    wallet AS (
+        SELECT e.project_id,
+               SUM(CASE WHEN e.type = 'credit' THEN e.amount ELSE -e.amount END) AS balance
+        FROM fieldops.expense_transactions e
+        WHERE e.project_id = ANY (p_project_ids)
+        GROUP BY e.project_id
+    ),
+    task_stats AS (
+        SELECT t.project_id,
+               COUNT(*) AS task_count,
+               COUNT(*) FILTER (
+                   WHERE t.due_at < ((p_today + 1)::timestamp AT TIME ZONE 'UTC')
+                     AND upper(trim(COALESCE(s.name, ''))) <> ALL (COALESCE((SELECT names FROM done), '{}'))
+               ) AS due_tasks
+        FROM fieldops.tasks t
+        LEFT JOIN fieldops.project_task_statuses s ON s.id = t.status_id
+        WHERE t.project_id = ANY (p_project_ids)
+          AND (NOT p_only_assigned OR t.assignee_id = p_user_id)
+        GROUP BY t.project_id
+    ),
+    present AS (
+        SELECT a.project_id, COUNT(*) AS cnt
+        FROM fieldops.attendance a
+        WHERE a.project_id = ANY (p_project_ids) AND a.date = p_today
+        GROUP BY a.project_id
+    )
+    SELECT ids.project_id,
+           COALESCE(wallet.balance, 0),
+           COALESCE(task_stats.task_count, 0),
+           COALESCE(task_stats.due_tasks, 0),
+           COALESCE(present.cnt, 0)
+    FROM ids
+    LEFT JOIN wallet ON wallet.project_id = ids.project_id
+    LEFT JOIN task_stats ON task_stats.project_id = ids.project_id
+    LEFT JOIN present ON present.project_id = ids.project_id;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.dashboard_project_stats(UUID[], UUID, BOOLEAN, DATE, TEXT[]) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,31 @@
+-- Due-task counting in the database. Run after 016.
+CREATE INDEX IF NOT EXISTS idx_tasks_project_due_at
+    ON fieldops.tasks(project_id, due_at)
+    WHERE due_at IS NOT NULL;
+
+-- Count of tasks due on or before p_today (UTC) whose status is not a "done" status.
+-- p_assignee_id NULL counts every task of the project.
+CREATE OR REPLACE FUNCTION fieldops.count_due_tasks(
+    p_project_id UUID,
+    p_today DATE,
+    p_done_status_names TEXT[],
+    p_assignee_id UUID DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COUNT(*)
+    FROM fieldops.tasks t
+    LEFT JOIN fieldops.project_task_statuses s ON s.id = t.status_id
+    WHERE t.project_id = p_project_id
+      AND t.due_at < ((p_today + 1)::timestamp AT TIME ZONE 'UTC')
+      AND (p_assignee_id IS NULL OR t.assignee_id = p_assignee_id)
+      AND upper(trim(COALESCE(s.name, ''))) <> ALL (
+          COALESCE((SELECT array_agg(upper(trim(n))) FROM unnest(p_done_status_names) AS n), '{}')
+      );
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.count_due_tasks(UUID, DATE, TEXT[], UUID) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,142 @@
+-- Maintained wallet balance per project (kept in sync with expense_transactions by trigger). Run after 017.
+CREATE TABLE IF NOT EXISTS fieldops.project_wallets (
+    project_id UUID PRIMARY KEY REFERENCES fieldops.projects(id) ON DELETE CASCADE,
+    balance DECIMAL NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+ALTER TABLE fieldops.project_wallets ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role project_wallets" ON fieldops.project_wallets FOR ALL USING (true) WITH CHECK (true);
+GRANT ALL ON fieldops.project_wallets TO anon, authenticated, service_role;
+
+CREATE OR REPLACE FUNCTION fieldops.apply_wallet_delta(p_project_id UUID, p_delta DECIMAL)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO fieldops.project_wallets (project_id, balance, updated_at)
+    VALUES (p_project_id, p_delta, now())
+    ON CONFLICT (project_id) DO UPDATE
+        SET balance = fieldops.project_wallets.balance + EXCLUDED.balance,
+            updated_at = now();
+$$;
+
+CREATE OR REPLACE FUNCTION fieldops.expense_transactions_wallet_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fieldops.apply_wallet_delta(
+            OLD.project_id, CASE WHEN OLD.type = 'credit' THEN -OLD.amount ELSE OLD.amount END
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fieldops.apply_wallet_delta(
+            NEW.project_id, CASE WHEN NEW.type = 'credit' THEN NEW.amount ELSE -NEW.amount END
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_expense_transactions_wallet ON fieldops.expense_transactions;
+CREATE TRIGGER trg_expense_transactions_wallet
+    AFTER INSERT OR UPDATE OF project_id, type, amount OR DELETE ON fieldops.expense_transactions
+    FOR EACH ROW EXECUTE FUNCTION fieldops.expense_transactions_wallet_trigger();
+
+-- Compare maintained balances with the transaction log; with p_apply, overwrite them with the recomputed value.
+-- Returns only projects that drifted.
+CREATE OR REPLACE FUNCTION fieldops.reconcile_project_wallets(p_apply BOOLEAN DEFAULT false)
+RETURNS TABLE (project_id UUID, stored_balance DECIMAL, computed_balance DECIMAL)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH computed AS (
+        SELECT p.id AS project_id,
+               COALESCE(SUM(CASE WHEN e.type = 'credit' THEN e.amount ELSE -e.amount END), 0) AS balance
+        FROM fieldops.projects p
+        LEFT JOIN fieldops.expense_transactions e ON e.project_id = p.id
+        GROUP BY p.id
+    )
+    SELECT c.project_id, COALESCE(w.balance, 0), c.balance
+    FROM computed c
+    LEFT JOIN fieldops.project_wallets w ON w.project_id = c.project_id
+    WHERE COALESCE(w.balance, 0) <> c.balance OR (w.project_id IS NULL AND c.balance <> 0);
+
+    IF p_apply THEN
+        INSERT INTO fieldops.project_wallets (project_id, balance, updated_at)
+        SELECT p.id,
+               COALESCE(SUM(CASE WHEN e.type = 'credit' THEN e.amount ELSE -e.amount END), 0),
+               now()
+        FROM fieldops.projects p
+        LEFT JOIN fieldops.expense_transactions e ON e.project_id = p.id
+        GROUP BY p.id
+        ON CONFLICT (project_id) DO UPDATE
+            SET balance = EXCLUDED.balance, updated_at = now()
+            WHERE fieldops.project_wallets.balance IS DISTINCT FROM EXCLUDED.balance;
+    END IF;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.reconcile_project_wallets(BOOLEAN) TO service_role;
+
+-- Backfill from existing transactions
+SELECT count(*) FROM fieldops.reconcile_project_wallets(true);
+
+-- Dashboard stats read the maintained balance instead of summing transactions
+CREATE OR REPLACE FUNCTION fieldops.dashboard_project_stats(
+    p_project_ids UUID[],
+    p_user_id UUID,
+    p_only_assigned BOOLEAN,
+    p_today DATE,
+    p_done_status_names TEXT[]
+)
+RETURNS TABLE (
+    project_id UUID,
+    wallet_balance NUMERIC,
+    task_count BIGINT,
+    due_tasks BIGINT,
+    today_attendance_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH ids AS (
+        SELECT DISTINCT unnest(p_project_ids) AS project_id
+    ),
+    done AS (
+        SELECT array_agg(upper(trim(n))) AS names FROM unnest(p_done_status_names) AS n
+    ),
+    task_stats AS (
+        SELECT t.project_id,
+               COUNT(*) AS task_count,
+               COUNT(*) FILTER (
+                   WHERE t.due_at < ((p_today + 1)::timestamp AT TIME ZONE 'UTC')
+                     AND upper(trim(COALESCE(s.name, ''))) <> ALL (COALESCE((SELECT names FROM done), '{}'))
+               ) AS due_tasks
+        FROM fieldops.tasks t
+        LEFT JOIN fieldops.project_task_statuses s ON s.id = t.status_id
+        WHERE t.project_id = ANY (p_project_ids)
+          AND (NOT p_only_assigned OR t.assignee_id = p_user_id)
+        GROUP BY t.project_id
+    ),
+    present AS (
+        SELECT a.project_id, COUNT(*) AS cnt
+        FROM fieldops.attendance a
+        WHERE a.project_id = ANY (p_project_ids) AND a.date = p_today
+        GROUP BY a.project_id
+    )
+    SELECT ids.project_id,
+           COALESCE(w.balance, 0),
+           COALESCE(task_stats.task_count, 0),
+           COALESCE(task_stats.due_tasks, 0),
+           COALESCE(present.cnt, 0)
+    FROM ids
+    LEFT JOIN fieldops.project_wallets w ON w.project_id = ids.project_id
+    LEFT JOIN task_stats ON task_stats.project_id = ids.project_id
+    LEFT JOIN present ON present.project_id = ids.project_id;
+$$;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,3 @@
+-- Keyset pagination of wallet history (newest first). Run after 018.
+CREATE INDEX IF NOT EXISTS idx_expense_project_created
+    ON fieldops.expense_transactions(project_id, created_at DESC, id DESC);
@@ -0,0 +1,26 @@
+-- Materials with their ledger balance for a set of projects, aggregated in one grouped query. Run after 014.
+CREATE OR REPLACE FUNCTION fieldops.project_material_balances(p_project_ids UUID[])
+RETURNS TABLE (
+    id UUID,
+    project_id UUID,
+    name TEXT,
+    unit TEXT,
+    master_material_id UUID,
+    created_at TIMESTAMPTZ,
+    balance NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.id, m.project_id, m.name, m.unit, m.master_material_id, m.created_at,
+           COALESCE(SUM(CASE WHEN l.type = 'in' THEN l.quantity ELSE -l.quantity END), 0)
+    FROM fieldops.materials m
+    LEFT JOIN fieldops.material_ledger l ON l.material_id = m.id
+    WHERE m.project_id = ANY (p_project_ids)
+    GROUP BY m.id
+    ORDER BY m.project_id, m.created_at;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.project_material_balances(UUID[]) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,115 @@
+-- Maintained stock on hand per material (kept in sync with material_ledger by trigger). Run after 020.
+CREATE TABLE IF NOT EXISTS fieldops.material_stock (
+    material_id UUID PRIMARY KEY REFERENCES fieldops.materials(id) ON DELETE CASCADE,
+    project_id UUID NOT NULL REFERENCES fieldops.projects(id) ON DELETE CASCADE,
+    balance DECIMAL NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_material_stock_project ON fieldops.material_stock(project_id);
+
+ALTER TABLE fieldops.material_stock ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role material_stock" ON fieldops.material_stock FOR ALL USING (true) WITH CHECK (true);
+GRANT ALL ON fieldops.material_stock TO anon, authenticated, service_role;
+
+CREATE OR REPLACE FUNCTION fieldops.apply_stock_delta(p_material_id UUID, p_delta DECIMAL)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO fieldops.material_stock (material_id, project_id, balance, updated_at)
+    SELECT m.id, m.project_id, p_delta, now()
+    FROM fieldops.materials m
+    WHERE m.id = p_material_id
+    ON CONFLICT (material_id) DO UPDATE
+        SET balance = fieldops.material_stock.balance + EXCLUDED.balance,
+            updated_at = now();
+$$;
+
+CREATE OR REPLACE FUNCTION fieldops.material_ledger_stock_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM fieldops.apply_stock_delta(
+            OLD.material_id, CASE WHEN OLD.type = 'in' THEN -OLD.quantity ELSE OLD.quantity END
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM fieldops.apply_stock_delta(
+            NEW.material_id, CASE WHEN NEW.type = 'in' THEN NEW.quantity ELSE -NEW.quantity END
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_material_ledger_stock ON fieldops.material_ledger;
+CREATE TRIGGER trg_material_ledger_stock
+    AFTER INSERT OR UPDATE OF material_id, type, quantity OR DELETE ON fieldops.material_ledger
+    FOR EACH ROW EXECUTE FUNCTION fieldops.material_ledger_stock_trigger();
+
+-- Compare stock on hand with the ledger; with p_apply, overwrite it with the recomputed value.
+-- Returns only materials that drifted.
+CREATE OR REPLACE FUNCTION fieldops.reconcile_material_stock(p_apply BOOLEAN DEFAULT false)
+RETURNS TABLE (material_id UUID, stored_balance DECIMAL, computed_balance DECIMAL)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH computed AS (
+        SELECT m.id AS material_id,
+               COALESCE(SUM(CASE WHEN l.type = 'in' THEN l.quantity ELSE -l.quantity END), 0) AS balance
+        FROM fieldops.materials m
+        LEFT JOIN fieldops.material_ledger l ON l.material_id = m.id
+        GROUP BY m.id
+    )
+    SELECT c.material_id, COALESCE(s.balance, 0), c.balance
+    FROM computed c
+    LEFT JOIN fieldops.material_stock s ON s.material_id = c.material_id
+    WHERE COALESCE(s.balance, 0) <> c.balance;
+
+    IF p_apply THEN
+        INSERT INTO fieldops.material_stock (material_id, project_id, balance, updated_at)
+        SELECT m.id, m.project_id,
+               COALESCE(SUM(CASE WHEN l.type = 'in' THEN l.quantity ELSE -l.quantity END), 0),
+               now()
+        FROM fieldops.materials m
+        LEFT JOIN fieldops.material_ledger l ON l.material_id = m.id
+        GROUP BY m.id
+        ON CONFLICT (material_id) DO UPDATE
+            SET balance = EXCLUDED.balance, updated_at = now()
+            WHERE fieldops.material_stock.balance IS DISTINCT FROM EXCLUDED.balance;
+    END IF;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.reconcile_material_stock(BOOLEAN) TO service_role;
+
+-- Backfill from the existing ledger
+SELECT count(*) FROM fieldops.reconcile_material_stock(true);
+
+-- Material lists read stock on hand instead of summing the ledger
+CREATE OR REPLACE FUNCTION fieldops.project_material_balances(p_project_ids UUID[])
+RETURNS TABLE (
+    id UUID,
+    project_id UUID,
+    name TEXT,
+    unit TEXT,
+    master_material_id UUID,
+    created_at TIMESTAMPTZ,
+    balance NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.id, m.project_id, m.name, m.unit, m.master_material_id, m.created_at,
+           COALESCE(s.balance, 0)
+    FROM fieldops.materials m
+    LEFT JOIN fieldops.material_stock s ON s.material_id = m.id
+    WHERE m.project_id = ANY (p_project_ids)
+    ORDER BY m.project_id, m.created_at;
+$$;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,6 @@
+-- Keyset pagination and date windows over a material's ledger (newest first). Run after 021.
+CREATE INDEX IF NOT EXISTS idx_material_ledger_material_created
+    ON fieldops.material_ledger(material_id, created_at DESC, id DESC);
+
+-- Superseded by the composite index above (same leading column).
+DROP INDEX IF EXISTS fieldops.idx_material_ledger_material;
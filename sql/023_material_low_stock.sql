@@ -0,0 +1,94 @@
+-- Reorder thresholds and maintained low-stock flag on material_stock. Run after 022.
+-- A material's threshold overrides its master material's; is_low follows balance and threshold automatically.
+ALTER TABLE fieldops.master_materials
+    ADD COLUMN IF NOT EXISTS reorder_threshold DECIMAL CHECK (reorder_threshold >= 0);
+ALTER TABLE fieldops.materials
+    ADD COLUMN IF NOT EXISTS reorder_threshold DECIMAL CHECK (reorder_threshold >= 0);
+
+ALTER TABLE fieldops.material_stock
+    ADD COLUMN IF NOT EXISTS reorder_threshold DECIMAL;
+ALTER TABLE fieldops.material_stock
+    ADD COLUMN IF NOT EXISTS is_low BOOLEAN
+        GENERATED ALWAYS AS (reorder_threshold IS NOT NULL AND balance <= reorder_threshold) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_material_stock_low
+    ON fieldops.material_stock(project_id) WHERE is_low;
+
+-- Copy the effective threshold into material_stock when a material is created or its threshold/master changes
+CREATE OR REPLACE FUNCTION fieldops.materials_threshold_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO fieldops.material_stock (material_id, project_id, balance, reorder_threshold, updated_at)
+    SELECT NEW.id, NEW.project_id, 0,
+           COALESCE(NEW.reorder_threshold, mm.reorder_threshold),
+           now()
+    FROM (SELECT 1) one
+    LEFT JOIN fieldops.master_materials mm ON mm.id = NEW.master_material_id
+    ON CONFLICT (material_id) DO UPDATE
+        SET reorder_threshold = EXCLUDED.reorder_threshold,
+            updated_at = now()
+        WHERE fieldops.material_stock.reorder_threshold IS DISTINCT FROM EXCLUDED.reorder_threshold;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_materials_threshold ON fieldops.materials;
+CREATE TRIGGER trg_materials_threshold
+    AFTER INSERT OR UPDATE OF reorder_threshold, master_material_id ON fieldops.materials
+    FOR EACH ROW EXECUTE FUNCTION fieldops.materials_threshold_trigger();
+
+-- A master threshold change re-evaluates only the materials that inherit it
+CREATE OR REPLACE FUNCTION fieldops.master_materials_threshold_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE fieldops.material_stock s
+    SET reorder_threshold = NEW.reorder_threshold,
+        updated_at = now()
+    FROM fieldops.materials m
+    WHERE m.id = s.material_id
+      AND m.master_material_id = NEW.id
+      AND m.reorder_threshold IS NULL
+      AND s.reorder_threshold IS DISTINCT FROM NEW.reorder_threshold;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_master_materials_threshold ON fieldops.master_materials;
+CREATE TRIGGER trg_master_materials_threshold
+    AFTER UPDATE OF reorder_threshold ON fieldops.master_materials
+    FOR EACH ROW EXECUTE FUNCTION fieldops.master_materials_threshold_trigger();
+
+-- Materials created before 021 may have no stock row yet
+INSERT INTO fieldops.material_stock (material_id, project_id, balance)
+SELECT m.id, m.project_id, 0
+FROM fieldops.materials m
+ON CONFLICT (material_id) DO NOTHING;
+
+-- Low-stock materials of the given projects (served by the partial index)
+CREATE OR REPLACE FUNCTION fieldops.low_stock_materials(p_project_ids UUID[])
+RETURNS TABLE (
+    id UUID,
+    project_id UUID,
+    name TEXT,
+    unit TEXT,
+    master_material_id UUID,
+    balance NUMERIC,
+    reorder_threshold NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.id, s.project_id, m.name, m.unit, m.master_material_id, s.balance, s.reorder_threshold
+    FROM fieldops.material_stock s
+    JOIN fieldops.materials m ON m.id = s.material_id
+    WHERE s.is_low AND s.project_id = ANY (p_project_ids)
+    ORDER BY s.project_id, s.balance - s.reorder_threshold, m.name;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.low_stock_materials(UUID[]) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,18 @@
+-- Daily "out" totals per material for consumption forecasting. Run after 023.
+CREATE OR REPLACE FUNCTION fieldops.material_daily_consumption(p_project_ids UUID[], p_since DATE)
+RETURNS TABLE (material_id UUID, day DATE, quantity NUMERIC)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT l.material_id, (l.created_at AT TIME ZONE 'UTC')::date AS day, SUM(l.quantity)
+    FROM fieldops.materials m
+    JOIN fieldops.material_ledger l ON l.material_id = m.id
+    WHERE m.project_id = ANY (p_project_ids)
+      AND l.type = 'out'
+      AND l.created_at >= p_since
+    GROUP BY l.material_id, day;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.material_daily_consumption(UUID[], DATE) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
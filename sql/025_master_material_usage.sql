@@ -0,0 +1,49 @@
+-- Master material usage answered in one joined query each. Run after 024.
+
+-- True if a project the user admins has a material linked to this master
+CREATE OR REPLACE FUNCTION fieldops.master_material_used_in_admin_projects(
+    p_master_material_id UUID,
+    p_user_id UUID
+)
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT EXISTS (
+        SELECT 1
+        FROM fieldops.materials m
+        JOIN fieldops.project_members pm
+          ON pm.project_id = m.project_id AND pm.user_id = p_user_id AND pm.role = 'admin'
+        WHERE m.master_material_id = p_master_material_id
+    );
+$$;
+
+-- Projects using each master material of the tenant (optionally only the given ones), with stock on hand
+CREATE OR REPLACE FUNCTION fieldops.master_material_usage(
+    p_tenant_id UUID,
+    p_master_material_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (
+    master_material_id UUID,
+    project_id UUID,
+    project_name TEXT,
+    material_id UUID,
+    balance NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT mm.id, p.id, p.name, m.id, COALESCE(s.balance, 0)
+    FROM fieldops.master_materials mm
+    JOIN fieldops.materials m ON m.master_material_id = mm.id
+    JOIN fieldops.projects p ON p.id = m.project_id AND p.tenant_id = mm.tenant_id
+    LEFT JOIN fieldops.material_stock s ON s.material_id = m.id
+    WHERE mm.tenant_id = p_tenant_id
+      AND (p_master_material_ids IS NULL OR mm.id = ANY (p_master_material_ids))
+    ORDER BY mm.id, p.name;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.master_material_used_in_admin_projects(UUID, UUID) TO service_role;
+GRANT EXECUTE ON FUNCTION fieldops.master_material_usage(UUID, UUID[]) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,85 @@
+-- Unit conversions and tenant-wide stock rollup per master material. Run after 025.
+-- Both directions are stored, so lookups are a single indexed match. master_material_id NULL = applies to every material.
+CREATE TABLE IF NOT EXISTS fieldops.unit_conversions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    master_material_id UUID REFERENCES fieldops.master_materials(id) ON DELETE CASCADE,
+    from_unit TEXT NOT NULL,
+    to_unit TEXT NOT NULL,
+    factor DECIMAL NOT NULL CHECK (factor > 0),  -- quantity in to_unit = quantity in from_unit * factor
+    created_at TIMESTAMPTZ DEFAULT now(),
+    CHECK (from_unit <> to_unit)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_unit_conversions_material
+    ON fieldops.unit_conversions(master_material_id, from_unit, to_unit) WHERE master_material_id IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_unit_conversions_global
+    ON fieldops.unit_conversions(from_unit, to_unit) WHERE master_material_id IS NULL;
+
+ALTER TABLE fieldops.unit_conversions ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role unit_conversions" ON fieldops.unit_conversions FOR ALL USING (true) WITH CHECK (true);
+GRANT ALL ON fieldops.unit_conversions TO anon, authenticated, service_role;
+
+INSERT INTO fieldops.unit_conversions (master_material_id, from_unit, to_unit, factor)
+VALUES (NULL, 'kg', 'tonnes', 0.001), (NULL, 'tonnes', 'kg', 1000)
+ON CONFLICT DO NOTHING;
+
+-- Set a per-material conversion (e.g. 1 roll = 50 m) together with its inverse
+CREATE OR REPLACE FUNCTION fieldops.set_unit_conversion(
+    p_master_material_id UUID,
+    p_from_unit TEXT,
+    p_to_unit TEXT,
+    p_factor DECIMAL
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM fieldops.unit_conversions
+    WHERE master_material_id = p_master_material_id
+      AND (from_unit, to_unit) IN ((p_from_unit, p_to_unit), (p_to_unit, p_from_unit));
+    INSERT INTO fieldops.unit_conversions (master_material_id, from_unit, to_unit, factor)
+    VALUES (p_master_material_id, p_from_unit, p_to_unit, p_factor),
+           (p_master_material_id, p_to_unit, p_from_unit, 1 / p_factor);
+$$;
+
+-- Stock on hand per master material across projects, converted to the master's unit.
+-- Materials whose unit has no conversion are counted in unconverted_count and left out of the total.
+CREATE OR REPLACE FUNCTION fieldops.material_stock_rollup(p_project_ids UUID[])
+RETURNS TABLE (
+    master_material_id UUID,
+    name TEXT,
+    unit TEXT,
+    total_quantity NUMERIC,
+    project_count BIGINT,
+    material_count BIGINT,
+    unconverted_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH linked AS (
+        SELECT mm.id AS master_id, mm.name, mm.unit AS target_unit, m.project_id,
+               COALESCE(s.balance, 0) AS balance,
+               CASE WHEN m.unit = mm.unit THEN 1 ELSE COALESCE(own.factor, global.factor) END AS factor
+        FROM fieldops.materials m
+        JOIN fieldops.master_materials mm ON mm.id = m.master_material_id
+        LEFT JOIN fieldops.material_stock s ON s.material_id = m.id
+        LEFT JOIN fieldops.unit_conversions own
+          ON own.master_material_id = mm.id AND own.from_unit = m.unit AND own.to_unit = mm.unit
+        LEFT JOIN fieldops.unit_conversions global
+          ON global.master_material_id IS NULL AND global.from_unit = m.unit AND global.to_unit = mm.unit
+        WHERE m.project_id = ANY (p_project_ids)
+    )
+    SELECT master_id, name, target_unit,
+           COALESCE(SUM(balance * factor), 0),
+           COUNT(DISTINCT project_id) FILTER (WHERE factor IS NOT NULL),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE factor IS NULL)
+    FROM linked
+    GROUP BY master_id, name, target_unit
+    ORDER BY name;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.set_unit_conversion(UUID, TEXT, TEXT, DECIMAL) TO service_role;
+GRANT EXECUTE ON FUNCTION fieldops.material_stock_rollup(UUID[]) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
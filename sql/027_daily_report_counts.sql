@@ -0,0 +1,21 @@
+-- Per-day report/photo/note counts for calendar heatmaps. Run after 026.
+CREATE OR REPLACE FUNCTION fieldops.daily_report_counts(p_project_id UUID, p_from DATE, p_to DATE)
+RETURNS TABLE (report_date DATE, report_count BIGINT, photo_count BIGINT, note_count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT r.report_date,
+           COUNT(DISTINCT r.id),
+           COUNT(e.id) FILTER (WHERE e.type = 'photo'),
+           COUNT(e.id) FILTER (WHERE e.type = 'note')
+    FROM fieldops.daily_reports r
+    LEFT JOIN fieldops.daily_report_entries e ON e.daily_report_id = r.id
+    WHERE r.project_id = p_project_id
+      AND r.report_date BETWEEN p_from AND p_to
+    GROUP BY r.report_date
+    ORDER BY r.report_date DESC;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.daily_report_counts(UUID, DATE, DATE) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
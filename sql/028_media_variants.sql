@@ -0,0 +1,19 @@
+-- Resized variants of uploaded images (written by the background media worker). Run after 027.
+-- Variant paths are deterministic (<stem>__<variant>.jpg); rows record that a variant exists and its size.
+CREATE TABLE IF NOT EXISTS fieldops.media_variants (
+    bucket TEXT NOT NULL,
+    object_path TEXT NOT NULL,
+    variant TEXT NOT NULL CHECK (variant IN ('thumb', 'web')),
+    variant_path TEXT NOT NULL,
+    width INT,
+    height INT,
+    size_bytes BIGINT,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (bucket, object_path, variant)
+);
+
+ALTER TABLE fieldops.media_variants ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role media_variants" ON fieldops.media_variants FOR ALL USING (true) WITH CHECK (true);
+GRANT ALL ON fieldops.media_variants TO anon, authenticated, service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,11 @@
+-- Receipt paths are idempotency keys for the finalize endpoints. Run after 028.
+-- Every upload gets a fresh UUID path, so a second row with the same receipt can only come from a retried finalize.
+CREATE UNIQUE INDEX IF NOT EXISTS expense_transactions_receipt_storage_path_key
+    ON fieldops.expense_transactions (receipt_storage_path)
+    WHERE receipt_storage_path IS NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS material_ledger_receipt_path_key
+    ON fieldops.material_ledger (receipt_path)
+    WHERE receipt_path IS NOT NULL;
+
+NOTIFY pgrst, 'reload schema';
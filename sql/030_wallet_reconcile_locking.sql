@@ -0,0 +1,67 @@
+-- Safer wallet maintenance. Run after 029.
+-- apply_wallet_delta only writes a wallet for a project that still exists (a cascading project delete
+-- no longer trips the foreign key), and reconcile_project_wallets(true) locks the wallets it rebuilds.
+CREATE OR REPLACE FUNCTION fieldops.apply_wallet_delta(p_project_id UUID, p_delta DECIMAL)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO fieldops.project_wallets (project_id, balance, updated_at)
+    SELECT p.id, p_delta, now()
+    FROM fieldops.projects p
+    WHERE p.id = p_project_id
+    ON CONFLICT (project_id) DO UPDATE
+        SET balance = fieldops.project_wallets.balance + EXCLUDED.balance,
+            updated_at = now();
+$$;
+
+-- With p_apply, every project first gets a wallet row and all wallets are locked (FOR UPDATE) before
+-- the transaction log is summed: a concurrent expense write then waits in its trigger and applies its
+-- delta on top of the rebuilt balance, and one that got there first is committed, so the sum includes it.
+CREATE OR REPLACE FUNCTION fieldops.reconcile_project_wallets(p_apply BOOLEAN DEFAULT false)
+RETURNS TABLE (project_id UUID, stored_balance DECIMAL, computed_balance DECIMAL)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_locked UUID[];
+BEGIN
+    IF p_apply THEN
+        INSERT INTO fieldops.project_wallets (project_id, balance, updated_at)
+        SELECT p.id, 0, now() FROM fieldops.projects p
+        ON CONFLICT (project_id) DO NOTHING;
+        SELECT array_agg(w.project_id) INTO v_locked
+        FROM (SELECT project_id FROM fieldops.project_wallets FOR UPDATE) w;
+    END IF;
+
+    RETURN QUERY
+    WITH computed AS (
+        SELECT p.id AS project_id,
+               COALESCE(SUM(CASE WHEN e.type = 'credit' THEN e.amount ELSE -e.amount END), 0) AS balance
+        FROM fieldops.projects p
+        LEFT JOIN fieldops.expense_transactions e ON e.project_id = p.id
+        GROUP BY p.id
+    )
+    SELECT c.project_id, COALESCE(w.balance, 0), c.balance
+    FROM computed c
+    LEFT JOIN fieldops.project_wallets w ON w.project_id = c.project_id
+    WHERE COALESCE(w.balance, 0) <> c.balance;
+
+    IF p_apply THEN
+        -- Only the locked wallets: one created since then is maintained by the trigger alone
+        UPDATE fieldops.project_wallets w
+        SET balance = c.balance, updated_at = now()
+        FROM (
+            SELECT ids.project_id,
+                   COALESCE(SUM(CASE WHEN e.type = 'credit' THEN e.amount ELSE -e.amount END), 0) AS balance
+            FROM unnest(v_locked) AS ids(project_id)
+            LEFT JOIN fieldops.expense_transactions e ON e.project_id = ids.project_id
+            GROUP BY ids.project_id
+        ) c
+        WHERE w.project_id = c.project_id AND w.balance IS DISTINCT FROM c.balance;
+    END IF;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.reconcile_project_wallets(BOOLEAN) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,49 @@
+-- Lock stock rows while reconcile_material_stock(true) rebuilds them (same scheme as 030). Run after 030.
+CREATE OR REPLACE FUNCTION fieldops.reconcile_material_stock(p_apply BOOLEAN DEFAULT false)
+RETURNS TABLE (material_id UUID, stored_balance DECIMAL, computed_balance DECIMAL)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_locked UUID[];
+BEGIN
+    IF p_apply THEN
+        INSERT INTO fieldops.material_stock (material_id, project_id, balance, updated_at)
+        SELECT m.id, m.project_id, 0, now() FROM fieldops.materials m
+        ON CONFLICT (material_id) DO NOTHING;
+        SELECT array_agg(s.material_id) INTO v_locked
+        FROM (SELECT material_id FROM fieldops.material_stock FOR UPDATE) s;
+    END IF;
+
+    RETURN QUERY
+    WITH computed AS (
+        SELECT m.id AS material_id,
+               COALESCE(SUM(CASE WHEN l.type = 'in' THEN l.quantity ELSE -l.quantity END), 0) AS balance
+        FROM fieldops.materials m
+        LEFT JOIN fieldops.material_ledger l ON l.material_id = m.id
+        GROUP BY m.id
+    )
+    SELECT c.material_id, COALESCE(s.balance, 0), c.balance
+    FROM computed c
+    LEFT JOIN fieldops.material_stock s ON s.material_id = c.material_id
+    WHERE COALESCE(s.balance, 0) <> c.balance;
+
+    IF p_apply THEN
+        -- Only the locked rows: stock created since then is maintained by the trigger alone
+        UPDATE fieldops.material_stock s
+        SET balance = c.balance, updated_at = now()
+        FROM (
+            SELECT ids.material_id,
+                   COALESCE(SUM(CASE WHEN l.type = 'in' THEN l.quantity ELSE -l.quantity END), 0) AS balance
+            FROM unnest(v_locked) AS ids(material_id)
+            LEFT JOIN fieldops.material_ledger l ON l.material_id = ids.material_id
+            GROUP BY ids.material_id
+        ) c
+        WHERE s.material_id = c.material_id AND s.balance IS DISTINCT FROM c.balance;
+    END IF;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION fieldops.reconcile_material_stock(BOOLEAN) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,21 @@
+-- Photo paths are idempotency keys for /daily-reports/{project_id}/entries/photo/finalize. Run after 031.
+-- Photos from the old multipart route were named "<date>_<entry count>.jpg" and overwritten in place, so two concurrent
+-- uploads could record the same path twice in one report. Those duplicates point at the same object; keep the oldest.
+DELETE FROM fieldops.daily_report_entries
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY daily_report_id, content ORDER BY created_at NULLS FIRST, id
+        ) AS n
+        FROM fieldops.daily_report_entries
+        WHERE type = 'photo'
+    ) ranked
+    WHERE n > 1
+);
+
+-- Paths are now UUID-named, so from here on a second entry with the same path can only come from a retried finalize.
+CREATE UNIQUE INDEX IF NOT EXISTS daily_report_entries_photo_path_key
+    ON fieldops.daily_report_entries (daily_report_id, content)
+    WHERE type = 'photo';
+
+NOTIFY pgrst, 'reload schema';
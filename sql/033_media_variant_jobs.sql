@@ -0,0 +1,19 @@
+-- Images waiting for variants (app.core.media). Run after 032.
+-- A row is written when an upload is scheduled and deleted once its variants are stored, so jobs skipped on a
+-- full queue or lost with a stopped instance stay here until the periodic sweep re-queues them.
+CREATE TABLE IF NOT EXISTS fieldops.media_variant_jobs (
+    bucket TEXT NOT NULL,
+    object_path TEXT NOT NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    queued_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    created_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (bucket, object_path)
+);
+
+CREATE INDEX IF NOT EXISTS idx_media_variant_jobs_queued ON fieldops.media_variant_jobs(queued_at);
+
+ALTER TABLE fieldops.media_variant_jobs ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role media_variant_jobs" ON fieldops.media_variant_jobs FOR ALL USING (true) WITH CHECK (true);
+GRANT ALL ON fieldops.media_variant_jobs TO anon, authenticated, service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,31 @@
+from app.core.access import cached_lookup, invalidate_project, invalidate_project_member, project_role_key
+
+
+def test_cached_lookup_reuses_value_until_invalidated():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "member"
+
+    key = project_role_key("p-1", "u-1")
+    assert cached_lookup(key, loader) == "member"
+    assert cached_lookup(key, loader) == "member"
+    assert len(calls) == 1
+    invalidate_project_member("p-1", "u-1")
+    assert cached_lookup(key, loader) == "member"
+    assert len(calls) == 2
+    invalidate_project("p-1")
+
+
+def test_cached_lookup_does_not_cache_none():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None
+
+    key = project_role_key("p-2", "u-2")
+    assert cached_lookup(key, loader) is None
+    assert cached_lookup(key, loader) is None
+    assert len(calls) == 2
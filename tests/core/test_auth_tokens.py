@@ -0,0 +1,84 @@
+import base64
+import json
+import time
+
+import httpx
+import jwt
+import pytest
+
+from app.core.auth_tokens import JWKSCache, verify_access_token
+from app.core.config import Settings
+
+SECRET = "test-secret-with-at-least-32-bytes!!"
+URL = "https://example.supabase.co"
+
+
+def _settings(**kwargs) -> Settings:
+    return Settings(**{"SUPABASE_URL": URL, "SUPABASE_JWT_SECRET": SECRET, **kwargs})
+
+
+def _token(**claims) -> str:
+    payload = {
+        "sub": "user-1",
+        "aud": "authenticated",
+        "iss": f"{URL}/auth/v1",
+        "exp": int(time.time()) + 60,
+        "email": "a@example.com",
+        "app_metadata": {"tenant_id": "t-1"},
+        "user_metadata": {"full_name": "A"},
+    }
+    payload.update(claims)
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+class _NoKeys:
+    def get_key(self, kid):
+        return None
+
+
+def test_verify_hs256_returns_current_user_shape():
+    user = verify_access_token(_token(), _settings())
+    assert user == {
+        "id": "user-1",
+        "email": "a@example.com",
+        "raw_user_metadata": {"full_name": "A"},
+        "app_metadata": {"tenant_id": "t-1"},
+    }
+
+
+def test_verify_rejects_expired_and_wrong_audience():
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verify_access_token(_token(exp=int(time.time()) - 10), _settings())
+    with pytest.raises(jwt.InvalidAudienceError):
+        verify_access_token(_token(aud="anon"), _settings())
+
+
+def test_falls_back_when_key_unknown():
+    assert verify_access_token(_token(), _settings(SUPABASE_JWT_SECRET="")) is None
+    header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": "x"}).encode()).rstrip(b"=").decode()
+    rs_like = f"{header}.e30.c2ln"
+    assert verify_access_token(rs_like, _settings(), jwks=_NoKeys()) is None
+
+
+def test_failed_jwks_fetch_still_rate_limits_forced_refresh(monkeypatch):
+    calls = []
+
+    class _FailingClient:
+        def __init__(self, **_):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            return False
+
+        def get(self, url):
+            calls.append(url)
+            raise httpx.ConnectError("down")
+
+    monkeypatch.setattr(httpx, "Client", _FailingClient)
+    cache = JWKSCache(f"{URL}/auth/v1/.well-known/jwks.json", 600)
+    assert cache.get_key("unknown") is None
+    assert cache.get_key("unknown") is None
+    assert len(calls) == 1
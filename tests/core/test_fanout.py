@@ -0,0 +1,34 @@
+import threading
+import time
+
+import pytest
+
+from app.core.fanout import chunked, fan_out
+
+
+def test_fan_out_keeps_input_order_and_caps_concurrency():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(i):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01 * (5 - i % 5))
+        with lock:
+            active -= 1
+        return i * 2
+
+    assert fan_out(work, range(12), max_concurrency=3) == [i * 2 for i in range(12)]
+    assert peak <= 3
+
+
+def test_fan_out_times_out():
+    with pytest.raises(TimeoutError):
+        fan_out(lambda _: time.sleep(0.5), [1, 2], timeout_sec=0.05)
+
+
+def test_chunked():
+    assert chunked([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
@@ -0,0 +1,136 @@
+import io
+import threading
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from app.core import media
+from app.core.media import render_variants, variant_path
+
+
+def test_variant_path_is_deterministic():
+    assert variant_path("p/u/2026-01-05_ab12.jpg", "thumb") == "p/u/2026-01-05_ab12__thumb.jpg"
+    assert variant_path("expense/p/key_receipt.PNG", "web") == "expense/p/key_receipt__web.jpg"
+    assert variant_path("a.b/no_extension", "thumb") == "a.b/no_extension__thumb.jpg"
+
+
+def test_render_variants_downscales_and_keeps_aspect():
+    buf = io.BytesIO()
+    Image.new("RGBA", (4000, 3000), (200, 10, 10, 255)).save(buf, "PNG")
+    out = render_variants(buf.getvalue())
+    data, w, h = out["thumb"]
+    assert (w, h) == (320, 240)
+    assert out["web"][1:] == (1600, 1200)
+    assert Image.open(io.BytesIO(data)).format == "JPEG"
+
+
+def test_render_variants_rejects_non_images():
+    with pytest.raises(ValueError):
+        render_variants(b"%PDF-1.7 not an image")
+
+
+def test_render_variants_decodes_large_jpegs_at_reduced_scale():
+    buf = io.BytesIO()
+    Image.new("RGB", (4032, 3024), (10, 120, 10)).save(buf, "JPEG")
+    out = render_variants(buf.getvalue())
+    assert out["web"][1:] == (1600, 1200)
+    assert out["thumb"][1:] == (320, 240)
+
+
+def test_schedule_skips_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(media, "_slots", threading.BoundedSemaphore(1))
+    release = threading.Event()
+    monkeypatch.setattr(media, "_run", lambda *_: release.wait(5))
+    assert media._submit(None, "b", "a.jpg", b"x")
+    assert not media._submit(None, "b", "b.jpg", b"x")
+    release.set()
+    media.shutdown_media_workers()
+    assert media._submit(None, "b", "c.jpg", b"x")
+    media.shutdown_media_workers()
+
+
+class _VariantRows:
+    def __init__(self, rows):
+        self.rows, self.filters = rows, {}
+
+    def schema(self, _):
+        return self
+
+    def table(self, _):
+        return self
+
+    def select(self, *_):
+        return self
+
+    def eq(self, col, value):
+        self.filters[col] = value
+        return self
+
+    def in_(self, col, values):
+        self.filters[col] = values
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[r for r in self.rows if r["object_path"] in self.filters["object_path"]])
+
+
+def test_find_variant_uses_recorded_rows_only():
+    db = _VariantRows([{"object_path": "p/u/b.jpg", "variant_path": "p/u/b__thumb.jpg"}])
+    assert media.find_variant(db, "daily_reports", ["daily_reports/p/u/b.jpg", "p/u/b.jpg"], "thumb") == "p/u/b__thumb.jpg"
+    assert db.filters == {"bucket": "daily_reports", "variant": "thumb", "object_path": ["daily_reports/p/u/b.jpg", "p/u/b.jpg"]}
+    assert media.find_variant(db, "daily_reports", ["p/u/not-rendered.jpg"], "thumb") is None
+
+
+class _Jobs:
+    def __init__(self, rows):
+        self.rows, self.filters, self.updates = rows, [], []
+
+    def schema(self, _):
+        return self
+
+    def table(self, _):
+        return self
+
+    def __getattr__(self, name):
+        def call(*args, **_):
+            self.filters.append((name, *args))
+            return self
+
+        return call
+
+    def update(self, values):
+        self.updates.append(values["attempts"])
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def test_sweep_requeues_recorded_jobs_until_queue_is_full(monkeypatch):
+    db = _Jobs([{"bucket": "b", "object_path": f"{i}.jpg", "attempts": i} for i in range(3)])
+    submitted = []
+
+    def submit(_s, bucket, path, content):
+        if len(submitted) == 2:
+            return False
+        submitted.append((bucket, path, content))
+        return True
+
+    monkeypatch.setattr(media, "_submit", submit)
+    assert media.sweep_pending_variants(db) == 2
+    assert submitted == [("b", "0.jpg", None), ("b", "1.jpg", None)]
+    assert db.updates == [1, 2]
+    assert ("lt", "attempts", media.get_settings().MEDIA_MAX_ATTEMPTS) in db.filters
+
+
+def test_finished_job_clears_its_record(monkeypatch):
+    cleared = []
+    monkeypatch.setattr(media, "_generate", lambda *_: None)
+    monkeypatch.setattr(media, "_clear_pending", lambda _s, bucket, path: cleared.append((bucket, path)))
+    media._run(None, "b", "a.jpg", b"x")
+    assert cleared == [("b", "a.jpg")]
+
+    monkeypatch.setattr(media, "_generate", lambda *_: 1 / 0)
+    media._run(None, "b", "c.jpg", b"x")
+    assert cleared == [("b", "a.jpg")]
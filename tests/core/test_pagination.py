@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_before, split_page
+
+ROW_ID = "00000000-0000-0000-0000-0000000000ab"
+
+
+def test_cursor_roundtrip_and_filter():
+    cursor = encode_cursor("2025-01-02T03:04:05.123+00:00", ROW_ID)
+    assert decode_cursor(cursor) == ("2025-01-02T03:04:05.123+00:00", ROW_ID)
+    assert keyset_before(cursor) == (
+        'created_at.lt."2025-01-02T03:04:05.123+00:00",'
+        f'and(created_at.eq."2025-01-02T03:04:05.123+00:00",id.lt.{ROW_ID})'
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        encode_cursor("2025-01-02T03:04:05+00:00", "abc"),
+        encode_cursor('2025-01-02",id.gt.0', ROW_ID),
+        encode_cursor("2025-01-02T03:04:05+00:00", f"{ROW_ID})"),
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_split_page():
+    rows = [
+        {"id": f"00000000-0000-0000-0000-00000000000{i}", "created_at": f"2025-01-0{i + 1}T00:00:00+00:00"}
+        for i in range(3)
+    ]
+    assert split_page(rows, 3) == (rows, None)
+    page, cursor = split_page(rows, 2)
+    assert page == rows[:2]
+    assert decode_cursor(cursor) == ("2025-01-02T00:00:00+00:00", "00000000-0000-0000-0000-000000000001")
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import storage
+
+
+class _FakeStorage:
+    def __init__(self, existing):
+        self.existing, self.calls = set(existing), []
+
+    def list_buckets(self):
+        self.calls.append("list")
+        return [SimpleNamespace(name=n) for n in self.existing]
+
+    def create_bucket(self, name, options=None):
+        self.calls.append(f"create:{name}")
+        self.existing.add(name)
+
+
+def test_bootstrap_creates_missing_once_then_trusts_cache(monkeypatch):
+    monkeypatch.setattr(storage, "_known", set())
+    fake = _FakeStorage({"attendance", "expense"})
+    supabase = SimpleNamespace(storage=fake)
+
+    storage.bootstrap_buckets(supabase)
+    assert fake.calls == ["list", "create:daily_reports", "create:material_receipts"]
+
+    storage.ensure_bucket(supabase, "daily_reports")
+    storage.bootstrap_buckets(supabase)
+    assert len(fake.calls) == 3
+
+
+def test_confirm_upload_checks_prefix_and_existence(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(storage, "schedule_stored_variants", lambda _s, b, p: scheduled.append((b, p)))
+    objects = {"p-1/u-1/2026-01-05_ab.jpg"}
+    bucket = SimpleNamespace(exists=lambda path: path in objects)
+    supabase = SimpleNamespace(storage=SimpleNamespace(from_=lambda _name: bucket))
+
+    assert storage.confirm_upload(supabase, "daily_reports", "/p-1/u-1/2026-01-05_ab.jpg", "p-1/u-1/") == (
+        "p-1/u-1/2026-01-05_ab.jpg"
+    )
+    assert scheduled == [("daily_reports", "p-1/u-1/2026-01-05_ab.jpg")]
+    for path in ("p-2/u-1/x.jpg", "p-1/u-1/../u-2/x.jpg", "p-1/u-1/missing.jpg"):
+        with pytest.raises(ValueError):
+            storage.confirm_upload(supabase, "daily_reports", path, "p-1/u-1/")
+
+
+def test_confirm_upload_reports_storage_failures_separately(monkeypatch):
+    monkeypatch.setattr(storage, "schedule_stored_variants", lambda *_: None)
+
+    def exists(_path):
+        raise RuntimeError("storage 503")
+
+    bucket = SimpleNamespace(exists=exists)
+    supabase = SimpleNamespace(storage=SimpleNamespace(from_=lambda _name: bucket))
+    with pytest.raises(ConnectionError):
+        storage.confirm_upload(supabase, "expense", "expense/p-1/x.jpg", "expense/p-1/")
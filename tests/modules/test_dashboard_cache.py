@@ -0,0 +1,46 @@
+import time
+
+from app.modules.dashboard.cache import SummaryCache
+from app.modules.dashboard.schemas import DashboardSummaryResponse, ProjectSummaryItem
+
+
+def _summary(total_tasks: int) -> DashboardSummaryResponse:
+    item = ProjectSummaryItem(project_id="p-1", project_name="Site", task_count=total_tasks)
+    return DashboardSummaryResponse(projects=[item], total_sites=1, total_tasks=total_tasks)
+
+
+def test_hit_then_stale_while_revalidate_after_invalidation():
+    cache = SummaryCache(ttl_sec=60, stale_sec=60)
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return _summary(len(computed))
+
+    assert cache.get_or_compute("k", compute).total_tasks == 1
+    assert cache.get_or_compute("k", compute).total_tasks == 1
+    cache.invalidate_project("p-1")
+    # stale value served immediately, refresh happens in the background
+    assert cache.get_or_compute("k", compute).total_tasks == 1
+    for _ in range(100):
+        if cache.snapshot()["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert cache.get_or_compute("k", compute).total_tasks == 2
+    stats = cache.snapshot()
+    assert (stats["misses"], stats["stale_hits"], stats["refreshes"]) == (1, 1, 1)
+    assert stats["hits"] == 2
+
+
+def test_beyond_stale_bound_recomputes_synchronously():
+    cache = SummaryCache(ttl_sec=0, stale_sec=0)
+    computed = []
+
+    def compute():
+        computed.append(1)
+        return _summary(len(computed))
+
+    cache.get_or_compute("k", compute)
+    time.sleep(0.01)
+    assert cache.get_or_compute("k", compute).total_tasks == 2
+    assert cache.snapshot()["misses"] == 2
@@ -0,0 +1,60 @@
+import pytest
+from postgrest.exceptions import APIError
+
+from app.modules.expense import service
+from app.modules.expense.schemas import ExpenseTransactionResponse
+
+PATH = "expense/p-1/3f2c_receipt.jpg"
+
+
+def _debit(receipt_path=PATH):
+    return ExpenseTransactionResponse(
+        id="t-1",
+        project_id="p-1",
+        type="debit",
+        amount=40,
+        receipt_storage_path=receipt_path,
+        created_by="u-1",
+        created_at="2026-01-05T10:00:00+00:00",
+    )
+
+
+def test_retried_finalize_returns_recorded_debit(monkeypatch):
+    recorded = {}
+    monkeypatch.setattr(service, "get_debit_by_receipt", lambda _s, _p, path: recorded.get(path))
+    monkeypatch.setattr(service, "confirm_receipt", lambda _s, _p, path: path)
+
+    def add_debit(_s, _p, _amount, path, _notes, _by):
+        assert path not in recorded
+        recorded[path] = _debit(path)
+        return recorded[path]
+
+    monkeypatch.setattr(service, "add_debit", add_debit)
+    first = service.finalize_debit(None, "p-1", 40, "/" + PATH, None, "u-1")
+    again = service.finalize_debit(None, "p-1", 40, PATH, None, "u-1")
+    assert first == again and list(recorded) == [PATH]
+
+
+def test_concurrent_finalize_returns_winning_row(monkeypatch):
+    winner = _debit()
+    lookups = iter([None, winner])
+    monkeypatch.setattr(service, "get_debit_by_receipt", lambda *_: next(lookups))
+    monkeypatch.setattr(service, "confirm_receipt", lambda _s, _p, path: path)
+
+    def add_debit(*_):
+        raise APIError({"code": "23505", "message": "duplicate key value violates unique constraint"})
+
+    monkeypatch.setattr(service, "add_debit", add_debit)
+    assert service.finalize_debit(None, "p-1", 40, PATH, None, "u-1") is winner
+
+
+def test_other_insert_errors_propagate(monkeypatch):
+    monkeypatch.setattr(service, "get_debit_by_receipt", lambda *_: None)
+    monkeypatch.setattr(service, "confirm_receipt", lambda _s, _p, path: path)
+
+    def add_debit(*_):
+        raise APIError({"code": "23514", "message": "check violation"})
+
+    monkeypatch.setattr(service, "add_debit", add_debit)
+    with pytest.raises(APIError):
+        service.finalize_debit(None, "p-1", 40, PATH, None, "u-1")
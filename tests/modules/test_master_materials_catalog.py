@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+from app.core.cache import TTLCache
+from app.modules.master_materials import catalog, service
+from app.modules.master_materials.catalog import TenantCatalog
+from app.modules.master_materials.schemas import MasterMaterialResponse
+
+NAMES = ["Portland cement", "Cement bags 50kg", "Steel rebar 12mm", "Sand", "River sand", "Ceramic tiles"]
+CATALOG = TenantCatalog(
+    [MasterMaterialResponse(id=str(i), tenant_id="t", name=n, unit="pieces") for i, n in enumerate(NAMES)]
+)
+
+
+def _names(q, limit=20):
+    return [m.name for m in CATALOG.search(q, limit)]
+
+
+def test_prefix_ranks_name_prefix_before_word_prefix():
+    assert _names("cem") == ["Cement bags 50kg", "Portland cement"]
+    assert _names("SAND") == ["Sand", "River sand"]
+    assert _names("sa", limit=1) == ["Sand"]
+
+
+def test_trigram_fallback_tolerates_typos():
+    assert _names("rebr")[:1] == ["Steel rebar 12mm"]
+    assert set(_names("cemnt")) == {"Portland cement", "Cement bags 50kg"}
+    assert _names("xyzzy") == []
+
+
+def test_empty_query_lists_catalog_in_order():
+    assert _names("", limit=3) == NAMES[:3]
+
+
+class _Rows:
+    def __init__(self, row):
+        self.row, self.filters = row, []
+
+    def schema(self, _):
+        return self
+
+    def table(self, _):
+        return self
+
+    def select(self, *_):
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(col)
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.row)
+
+
+def test_lookup_uses_warm_catalog_only(monkeypatch):
+    monkeypatch.setattr(catalog, "_catalogs", TTLCache(60))
+    row = {"id": "9", "tenant_id": "t", "name": "Gravel", "unit": "kg"}
+    db = _Rows(row)
+    assert service.get_master_material(db, "9", "t").name == "Gravel"
+    assert db.filters == ["id", "tenant_id"]  # single-row query, the catalog was not loaded
+    assert catalog.peek_catalog("t") is None
+
+    catalog._catalogs.set("t", CATALOG)
+    db = _Rows(None)
+    assert service.get_master_material(db, "0", "t").name == "Portland cement"
+    assert db.filters == []
+    assert service.get_master_material(db, "0", "t", cached=False) is None
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from app.modules.materials.schemas import LedgerBatchItem
+from app.modules.materials.service import add_ledger_entries
+
+MAT_A = "00000000-0000-0000-0000-00000000000a"
+MAT_B = "00000000-0000-0000-0000-00000000000b"
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db, self.table, self.rows = db, table, None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, *_):
+        return self
+
+    def in_(self, _col, values):
+        self.db.calls.append(("select", self.table))
+        self.rows = [{"id": v} for v in values if v in self.db.materials]
+        return self
+
+    def insert(self, rows):
+        self.db.calls.append(("insert", self.table))
+        self.rows = [dict(r, id=f"l-{i}", created_at="2026-01-01T00:00:00+00:00") for i, r in enumerate(rows)]
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class _FakeSupabase:
+    def __init__(self, materials):
+        self.materials, self.calls = set(materials), []
+
+    def schema(self, _):
+        return self
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def test_batch_validates_set_wise_and_inserts_once():
+    db = _FakeSupabase([MAT_A])
+    items = [
+        LedgerBatchItem(material_id=MAT_A, type="in", quantity=10, client_ref="t-1"),
+        LedgerBatchItem(material_id=MAT_B, type="out", quantity=2),
+        LedgerBatchItem(material_id=MAT_A, type="sideways", quantity=1),
+        LedgerBatchItem(material_id="not-a-uuid", type="in", quantity=1),
+        LedgerBatchItem(material_id=MAT_A.upper().replace("-", ""), type="out", quantity=3),
+    ]
+    out = add_ledger_entries(db, "p-1", items, "u-1")
+    assert (out.created, out.rejected) == (2, 3)
+    assert [r.ok for r in out.results] == [True, False, False, False, True]
+    assert out.results[0].client_ref == "t-1" and out.results[0].entry.quantity == 10
+    assert out.results[4].entry.type == "out"
+    assert out.results[1].error == "Material not found"
+    assert out.results[3].error == "Invalid material_id"
+    assert out.results[4].entry.material_id == MAT_A
+    assert db.calls == [("select", "materials"), ("insert", "material_ledger")]
@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.modules.materials.forecast import project_days_remaining, usage_matrix
+
+START = date(2026, 1, 5)  # a Monday
+
+
+def test_usage_matrix_places_rows_and_ignores_unknown():
+    rows = [
+        {"material_id": "a", "day": "2026-01-05", "quantity": "2.5"},
+        {"material_id": "a", "day": "2026-01-07", "quantity": 1},
+        {"material_id": "b", "day": "2026-01-06", "quantity": 4},
+        {"material_id": "zzz", "day": "2026-01-06", "quantity": 9},
+        {"material_id": "b", "day": "2025-12-31", "quantity": 9},
+    ]
+    usage = usage_matrix(rows, ["a", "b"], START, 7)
+    assert usage.tolist() == [[2.5, 0, 1, 0, 0, 0, 0], [0, 4, 0, 0, 0, 0, 0]]
+
+
+def test_weekday_seasonality_and_days_remaining():
+    days = 28
+    weekday_only = np.tile([2.0, 2, 2, 2, 2, 0, 0], days // 7)  # 10 a week, nothing at weekends
+    flat = np.full(days, 1.0)
+    idle = np.zeros(days)
+    usage = np.vstack([weekday_only, flat, idle, flat])
+    balances = np.array([11.0, 2.5, 100.0, 0.0])
+
+    out = project_days_remaining(usage, balances, START, horizon=60)
+
+    np.testing.assert_allclose(out["rate_long"], [10 / 7, 1, 0, 1])
+    np.testing.assert_allclose(out["weekday_factors"][0], [1.4] * 5 + [0, 0])
+    np.testing.assert_allclose(out["weekday_factors"][1], [1] * 7)
+    # history ends on a Sunday, so projection starts Monday: 2/day Mon-Fri, then 2 again the next Monday
+    assert (START + timedelta(days=days)).weekday() == 0
+    assert out["days_remaining"][0] == 7.5
+    assert out["days_remaining"][1] == 2.5
+    assert np.isnan(out["days_remaining"][2])
+    assert out["days_remaining"][3] == 0
@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import storage
+from app.core.access import invalidate_project
+from app.core.dependencies import get_current_user, get_supabase_client
+from app.main import app
+
+OWN = "upload-routes-own"
+OTHER = "upload-routes-other"  # a project of another tenant
+USER = {"id": "u-1", "app_metadata": {"tenant_id": "t-1"}}
+
+
+class _Query:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def __getattr__(self, _):
+        return lambda *a, **k: self
+
+    def insert(self, row):
+        self.db.inserts.append((self.name, row))
+        return self
+
+    def execute(self):
+        if self.name == "resolve_project_access":
+            tenant = {OWN: "t-1", OTHER: "t-2"}[self.db.rpc_params["p_project_id"]]
+            return SimpleNamespace(data=[{"project_tenant_id": tenant, "tenant_role": "org_admin"}])
+        return SimpleNamespace(data=[])
+
+
+class _Bucket:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def create_signed_upload_url(self, path):
+        self.db.signed.append((self.name, path))
+        return {"signed_url": f"https://storage.test/{self.name}/{path}?token=tok", "token": "tok"}
+
+    def exists(self, path):
+        self.db.checked.append((self.name, path))
+        return True
+
+
+class _FakeSupabase:
+    def __init__(self):
+        self.signed, self.checked, self.inserts, self.rpc_params = [], [], [], None
+        self.storage = SimpleNamespace(from_=lambda name: _Bucket(self, name))
+
+    def schema(self, _):
+        return self
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        self.rpc_params = params
+        return _Query(self, name)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = _FakeSupabase()
+    monkeypatch.setattr(storage, "_known", set(storage.STORAGE_BUCKETS))
+    app.dependency_overrides[get_supabase_client] = lambda: fake
+    app.dependency_overrides[get_current_user] = lambda: USER
+    yield fake
+    app.dependency_overrides.clear()
+    invalidate_project(OWN)
+    invalidate_project(OTHER)
+
+
+def test_upload_url_is_scoped_to_callers_project(client, db):
+    r = client.post(
+        "/api/v1/storage/upload-url",
+        json={"purpose": "expense_receipt", "project_id": OWN, "filename": "bill.pdf"},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["bucket"] == "expense" and body["path"].startswith(f"expense/{OWN}/")
+    assert body["path"].endswith("_bill.pdf") and body["token"] == "tok"
+
+    r = client.post("/api/v1/storage/upload-url", json={"purpose": "expense_receipt", "project_id": OTHER})
+    assert r.status_code == 403
+    assert db.signed == [("expense", body["path"])]
+
+
+def test_finalize_rejects_objects_outside_callers_project(client, db):
+    r = client.post(
+        f"/api/v1/expense/{OWN}/debit/finalize",
+        json={"amount": 40, "receipt_path": f"expense/{OTHER}/3f2c_bill.pdf"},
+    )
+    assert (r.status_code, r.json()["detail"]) == (400, "Invalid upload path")
+    assert db.checked == [] and db.inserts == []
+
+
+def test_attendance_finalize_rejects_selfie_of_other_kind(client, db):
+    r = client.post(
+        f"/api/v1/attendance/{OWN}/check-out/finalize",
+        json={"date": "2026-01-05", "lat": 0, "lng": 0, "selfie_path": f"attendance/{OWN}/u-1/2026-01-05_in_ab12.jpg"},
+    )
+    assert (r.status_code, r.json()["detail"]) == (400, "Invalid upload path")
+    assert db.checked == [] and db.inserts == []
+
+
+def test_photo_finalize_rejects_photo_of_other_day(client, db):
+    r = client.post(
+        f"/api/v1/daily-reports/{OWN}/entries/photo/finalize",
+        json={"report_date": "2026-01-05", "path": f"{OWN}/u-1/2026-01-04_ab12.jpg"},
+    )
+    assert (r.status_code, r.json()["detail"]) == (400, "Invalid upload path")
+    assert db.checked == [] and db.inserts == []
+
+
+def test_upload_url_rejects_non_date_report_date(client, db):
+    r = client.post(
+        "/api/v1/storage/upload-url",
+        json={"purpose": "daily_report_photo", "project_id": OWN, "report_date": "x/../.."},
+    )
+    assert (r.status_code, r.json()["detail"]) == (400, "report_date must be a date (YYYY-MM-DD)")
+    assert db.signed == []